@@ -15,6 +15,12 @@ print("="*80)
 # Check database
 docs = document_manager.get_all_documents()
 
+# One directory read instead of an exists() call per document
+try:
+    disk_names = set(os.listdir('data/data'))
+except FileNotFoundError:
+    disk_names = set()
+
 print(f"\n📁 Documents in database: {len(docs)}")
 print("-" * 80)
 
@@ -27,8 +33,7 @@ for doc in docs:
     print(f"  By: {doc['uploaded_by']}")
     
     # Check if file exists on disk
-    file_path = os.path.join('data/data', doc['filename'])
-    exists = os.path.exists(file_path)
+    exists = doc['filename'] in disk_names
     print(f"  File on disk: {'✓ YES' if exists else '✗ NO'}")
 
 print("\n" + "="*80)
@@ -38,14 +43,16 @@ print("\n📂 Files in data/data directory:")
 print("-" * 80)
 
 data_dir = 'data/data'
-if os.path.exists(data_dir):
-    files = os.listdir(data_dir)
-    print(f"\nTotal files: {len(files)}")
-    for f in files:
-        file_path = os.path.join(data_dir, f)
-        size = os.path.getsize(file_path)
-        print(f"  - {f} ({size:,} bytes)")
-else:
+try:
+    # One directory listing instead of listdir + a path join per file; on Linux entry.stat()
+    # still makes one stat() call per file, it only saves the repeated path handling
+    with os.scandir(data_dir) as it:
+        entries = list(it)
+    print(f"\nTotal files: {len(entries)}")
+    for entry in entries:
+        size = entry.stat().st_size
+        print(f"  - {entry.name} ({size:,} bytes)")
+except FileNotFoundError:
     print("  Directory does not exist!")
 
 print("\n" + "="*80)
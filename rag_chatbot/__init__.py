@@ -1,6 +1,4 @@
-from .pipeline import LocalRAGPipeline
 from .ollama import run_ollama_server
-from .database import db, document_manager, report_manager, chat_history_manager
 
 __all__ = [
     "LocalRAGPipeline",
@@ -10,3 +8,16 @@ __all__ = [
     "report_manager",
     "chat_history_manager",
 ]
+
+
+def __getattr__(name: str):
+    # The pipeline pulls in llama_index and the model stack, so importing a light
+    # submodule (database, auth) must not load it
+    if name == "LocalRAGPipeline":
+        from .pipeline import LocalRAGPipeline
+        return LocalRAGPipeline
+    # Database globals are created on first access rather than on package import
+    if name in ("db", "document_manager", "report_manager", "chat_history_manager"):
+        from . import database
+        return getattr(database, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -6,10 +6,34 @@ Handles user registration, login, and session management
 import sqlite3
 import hashlib
 import secrets
-from datetime import datetime, timedelta
-from typing import Optional, Dict, Tuple
+import threading
+import time
+from collections import OrderedDict
+from datetime import timedelta
+from typing import Optional, Dict, List, Tuple
 from pathlib import Path
 
+from .database import get_user_role_manager
+
+# Public user fields; password_hash is only ever selected by login
+SESSION_USER_FIELDS = ("id", "username", "email", "full_name", "role")
+USER_FIELDS = SESSION_USER_FIELDS + ("created_at", "last_login")
+# Admin user listing also shows the account status
+ADMIN_USER_FIELDS = USER_FIELDS + ("is_active",)
+SESSION_USER_COLUMNS = ", ".join(SESSION_USER_FIELDS)
+USER_COLUMNS = ", ".join(USER_FIELDS)
+ADMIN_USER_COLUMNS = ", ".join(ADMIN_USER_FIELDS)
+# Same columns qualified for the sessions/users join
+SESSION_JOIN_COLUMNS = ", ".join(f"u.{field}" for field in SESSION_USER_FIELDS)
+
+# Schema version stored in PRAGMA user_version of the auth database; bump it when adding a migration
+AUTH_SCHEMA_VERSION = 1
+
+
+def _session_user(row: sqlite3.Row) -> Dict:
+    """Map a users row to the user_info dict returned by login/validate_session"""
+    return {field: row[field] for field in SESSION_USER_FIELDS}
+
 
 class AuthManager:
     """Manages user authentication and sessions"""
@@ -18,45 +42,84 @@ class AuthManager:
         """Initialize authentication manager"""
         self.db_path = db_path
         self.session_duration = timedelta(hours=24)  # Sessions valid for 24 hours
+        self._local = threading.local()
+        # token -> (cached_at, expires_ts, user_info); short TTL so revocations land quickly
+        self._session_cache: "OrderedDict[str, Tuple[float, float, Dict]]" = OrderedDict()
+        self._session_cache_lock = threading.Lock()
+        self._session_cache_ttl = 1.0
+        self._session_cache_size = 1024
         self._init_database()
     
+    def _conn(self) -> sqlite3.Connection:
+        """Return this thread's long-lived connection, opening it on first use"""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            # Writes open with BEGIN IMMEDIATE: the write lock is taken up front and waits
+            # on busy_timeout, instead of failing with SQLITE_BUSY on a deferred upgrade
+            conn = sqlite3.connect(self.db_path, check_same_thread=False, isolation_level="IMMEDIATE")
+            conn.row_factory = sqlite3.Row
+            # WAL persists in the DB file; the rest are per-connection
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA temp_store=MEMORY")
+            conn.execute("PRAGMA mmap_size=268435456")
+            self._local.conn = conn
+        return conn
+    
     def _init_database(self):
         """Initialize authentication tables"""
-        conn = sqlite3.connect(self.db_path)
+        conn = self._conn()
         cursor = conn.cursor()
+        version = cursor.execute("PRAGMA user_version").fetchone()[0]
         
-        # Users table
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS users (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                username TEXT UNIQUE NOT NULL,
-                email TEXT UNIQUE NOT NULL,
-                password_hash TEXT NOT NULL,
-                full_name TEXT,
-                role TEXT NOT NULL DEFAULT 'user',
-                is_active INTEGER DEFAULT 1,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                last_login TIMESTAMP
-            )
-        """)
-        
-        # Sessions table
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS sessions (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                user_id INTEGER NOT NULL,
-                session_token TEXT UNIQUE NOT NULL,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                expires_at TIMESTAMP NOT NULL,
-                ip_address TEXT,
-                user_agent TEXT,
-                FOREIGN KEY (user_id) REFERENCES users (id)
-            )
-        """)
-        
-        # Create default admin user if not exists
-        cursor.execute("SELECT COUNT(*) FROM users WHERE role = 'admin'")
-        if cursor.fetchone()[0] == 0:
+        # Tables, indexes and the expiry migration only run until the file is at AUTH_SCHEMA_VERSION
+        if version < AUTH_SCHEMA_VERSION:
+            # Users table
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS users (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    username TEXT UNIQUE NOT NULL,
+                    email TEXT UNIQUE NOT NULL,
+                    password_hash TEXT NOT NULL,
+                    full_name TEXT,
+                    role TEXT NOT NULL DEFAULT 'user',
+                    is_active INTEGER DEFAULT 1,
+                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    last_login TIMESTAMP
+                )
+            """)
+            
+            # Sessions table
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS sessions (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    user_id INTEGER NOT NULL,
+                    session_token TEXT UNIQUE NOT NULL,
+                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    expires_at INTEGER NOT NULL,
+                    ip_address TEXT,
+                    user_agent TEXT,
+                    FOREIGN KEY (user_id) REFERENCES users (id)
+                )
+            """)
+
+            # Older databases stored expires_at as local-time text; convert to epoch seconds
+            cursor.execute("""
+                UPDATE sessions
+                SET expires_at = CAST(strftime('%s', expires_at, 'utc') AS INTEGER)
+                WHERE typeof(expires_at) = 'text'
+            """)
+
+            # users.username/email and sessions.session_token are UNIQUE and
+            # therefore already indexed; these cover cleanup and per-user lookups
+            cursor.execute("CREATE INDEX IF NOT EXISTS idx_sessions_expires ON sessions(expires_at)")
+            cursor.execute("CREATE INDEX IF NOT EXISTS idx_sessions_user_id ON sessions(user_id)")
+            cursor.execute("CREATE INDEX IF NOT EXISTS idx_users_role ON users(role)")
+            cursor.execute(f"PRAGMA user_version = {AUTH_SCHEMA_VERSION}")
+
+        # Create default admin user if not exists (index probe, stops at first match)
+        cursor.execute("SELECT 1 FROM users WHERE role = 'admin' LIMIT 1")
+        if cursor.fetchone() is None:
             admin_password = self._hash_password("admin123")
             cursor.execute("""
                 INSERT INTO users (username, email, password_hash, full_name, role)
@@ -66,11 +129,22 @@ class AuthManager:
             print("⚠️  Please change the admin password after first login!")
         
         conn.commit()
-        conn.close()
     
-    def _hash_password(self, password: str) -> str:
-        """Hash password using SHA-256"""
-        return hashlib.sha256(password.encode()).hexdigest()
+    def _hash_password(self, password: str, salt: Optional[bytes] = None) -> str:
+        """Hash password with salted scrypt, stored as 'salt_hex$hash_hex'"""
+        salt = salt or secrets.token_bytes(16)
+        derived = hashlib.scrypt(password.encode(), salt=salt, n=2**14, r=8, p=1)
+        return f"{salt.hex()}${derived.hex()}"
+    
+    def _verify_password(self, password: str, stored_hash: str) -> bool:
+        """Check password against a stored scrypt hash (or a legacy SHA-256 hash)"""
+        if "$" not in stored_hash:
+            # Legacy unsalted SHA-256 hash from before the scrypt migration
+            candidate = hashlib.sha256(password.encode()).hexdigest()
+        else:
+            salt_hex = stored_hash.split("$", 1)[0]
+            candidate = self._hash_password(password, bytes.fromhex(salt_hex))
+        return secrets.compare_digest(candidate, stored_hash)
     
     def _generate_session_token(self) -> str:
         """Generate a secure random session token"""
@@ -100,7 +174,7 @@ class AuthManager:
             if not password or len(password) < 6:
                 return False, "Password must be at least 6 characters long", None
             
-            conn = sqlite3.connect(self.db_path)
+            conn = self._conn()
             cursor = conn.cursor()
             
             # Check if username or email already exists
@@ -111,7 +185,6 @@ class AuthManager:
             existing = cursor.fetchone()
             
             if existing:
-                conn.close()
                 if existing[0] == username:
                     return False, "Username already exists", None
                 else:
@@ -119,19 +192,17 @@ class AuthManager:
             
             # Hash password and create user
             password_hash = self._hash_password(password)
-            cursor.execute("""
-                INSERT INTO users (username, email, password_hash, full_name, role)
-                VALUES (?, ?, ?, ?, ?)
-            """, (username, email, password_hash, full_name, role))
+            with conn:
+                cursor.execute("""
+                    INSERT INTO users (username, email, password_hash, full_name, role)
+                    VALUES (?, ?, ?, ?, ?)
+                """, (username, email, password_hash, full_name, role))
             
             user_id = cursor.lastrowid
-            conn.commit()
-            conn.close()
             
             # Set technical role if provided
             if technical_role:
-                from .database import user_role_manager
-                user_role_manager.set_user_role(user_id, technical_role)
+                get_user_role_manager().set_user_role(user_id, technical_role)
             
             return True, "User registered successfully", user_id
             
@@ -150,52 +221,50 @@ class AuthManager:
         Returns: (success, message, session_token, user_info)
         """
         try:
-            conn = sqlite3.connect(self.db_path)
-            conn.row_factory = sqlite3.Row
+            conn = self._conn()
             cursor = conn.cursor()
             
             # Get user by username or email
-            cursor.execute("""
-                SELECT * FROM users 
+            cursor.execute(f"""
+                SELECT {SESSION_USER_COLUMNS}, password_hash FROM users 
                 WHERE (username = ? OR email = ?) AND is_active = 1
             """, (username, username))
             
             user = cursor.fetchone()
             
             if not user:
-                conn.close()
+                # Run the KDF anyway so unknown usernames take as long as bad passwords
+                self._hash_password(password)
                 return False, "Invalid username or password", None, None
             
             # Verify password
-            password_hash = self._hash_password(password)
-            if password_hash != user['password_hash']:
-                conn.close()
+            if not self._verify_password(password, user['password_hash']):
                 return False, "Invalid username or password", None, None
             
             # Create session
             session_token = self._generate_session_token()
-            expires_at = datetime.now() + self.session_duration
-            
-            cursor.execute("""
-                INSERT INTO sessions (user_id, session_token, expires_at, ip_address, user_agent)
-                VALUES (?, ?, ?, ?, ?)
-            """, (user['id'], session_token, expires_at, ip_address, user_agent))
-            
-            # Update last login
-            cursor.execute("""
-                UPDATE users SET last_login = CURRENT_TIMESTAMP WHERE id = ?
-            """, (user['id'],))
-            
-            conn.commit()
-            conn.close()
-            
-            user_info = {
-                'id': user['id'],
-                'username': user['username'],
-                'email': user['email'],
-                'full_name': user['full_name'],
-                'role': user['role']
-            }
+            expires_at = int(time.time() + self.session_duration.total_seconds())
+            
+            # Session insert and last_login update commit together
+            with conn:
+                cursor.execute("""
+                    INSERT INTO sessions (user_id, session_token, expires_at, ip_address, user_agent)
+                    VALUES (?, ?, ?, ?, ?)
+                """, (user['id'], session_token, expires_at, ip_address, user_agent))
+                
+                # Update last login
+                cursor.execute("""
+                    UPDATE users SET last_login = CURRENT_TIMESTAMP WHERE id = ?
+                """, (user['id'],))
+                
+                # Upgrade legacy SHA-256 hashes now that we know the plaintext
+                if "$" not in user['password_hash']:
+                    cursor.execute(
+                        "UPDATE users SET password_hash = ? WHERE id = ?",
+                        (self._hash_password(password), user['id'])
+                    )
+            
+            user_info = _session_user(user)
             
             return True, "Login successful", session_token, user_info
             
@@ -207,67 +276,150 @@ class AuthManager:
         Validate session token and return user info
         Returns: (is_valid, user_info)
         """
+        now = time.time()
+        with self._session_cache_lock:
+            cached = self._session_cache.get(session_token)
+            if cached and now - cached[0] < self._session_cache_ttl and now <= cached[1]:
+                self._session_cache.move_to_end(session_token)
+                return True, dict(cached[2])
+        
         try:
-            conn = sqlite3.connect(self.db_path)
-            conn.row_factory = sqlite3.Row
-            cursor = conn.cursor()
+            cursor = self._conn().cursor()
             
-            cursor.execute("""
-                SELECT u.*, s.expires_at
+            cursor.execute(f"""
+                SELECT {SESSION_JOIN_COLUMNS}, s.expires_at
                 FROM sessions s
                 JOIN users u ON s.user_id = u.id
                 WHERE s.session_token = ? AND u.is_active = 1
             """, (session_token,))
             
             result = cursor.fetchone()
-            conn.close()
             
             if not result:
                 return False, None
             
             # Check if session expired
-            expires_at = datetime.fromisoformat(result['expires_at'])
-            if datetime.now() > expires_at:
+            expires_at = result['expires_at']
+            if now > expires_at:
                 self.logout(session_token)
                 return False, None
             
-            user_info = {
-                'id': result['id'],
-                'username': result['username'],
-                'email': result['email'],
-                'full_name': result['full_name'],
-                'role': result['role']
-            }
+            user_info = _session_user(result)
             
-            return True, user_info
+            with self._session_cache_lock:
+                self._session_cache[session_token] = (now, expires_at, user_info)
+                self._session_cache.move_to_end(session_token)
+                if len(self._session_cache) > self._session_cache_size:
+                    self._session_cache.popitem(last=False)
+            
+            return True, dict(user_info)
             
         except Exception as e:
             print(f"Session validation error: {e}")
             return False, None
-    
+
+    def validate_sessions(self, session_tokens: List[str]) -> Dict[str, Optional[Dict]]:
+        """
+        Validate many session tokens with a single query
+        Returns: {session_token: user_info or None}
+        """
+        results: Dict[str, Optional[Dict]] = {token: None for token in session_tokens}
+        if not results:
+            return results
+
+        try:
+            conn = self._conn()
+            placeholders = ",".join("?" * len(results))
+            cursor = conn.execute(f"""
+                SELECT {SESSION_JOIN_COLUMNS}, s.session_token, s.expires_at
+                FROM sessions s
+                JOIN users u ON s.user_id = u.id
+                WHERE s.session_token IN ({placeholders}) AND u.is_active = 1
+            """, tuple(results))
+
+            now = time.time()
+            expired = []
+            for row in cursor.fetchall():
+                if now > row['expires_at']:
+                    expired.append(row['session_token'])
+                    continue
+                results[row['session_token']] = _session_user(row)
+
+            if expired:
+                with conn:
+                    conn.execute(
+                        f"DELETE FROM sessions WHERE session_token IN ({','.join('?' * len(expired))})",
+                        expired
+                    )
+
+            return results
+
+        except Exception as e:
+            print(f"Session validation error: {e}")
+            return {token: None for token in session_tokens}
+
     def logout(self, session_token: str) -> bool:
         """Delete session (logout user)"""
+        with self._session_cache_lock:
+            self._session_cache.pop(session_token, None)
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            cursor.execute("DELETE FROM sessions WHERE session_token = ?", (session_token,))
-            conn.commit()
-            conn.close()
+            with self._conn() as conn:
+                conn.execute("DELETE FROM sessions WHERE session_token = ?", (session_token,))
             return True
         except Exception as e:
             print(f"Logout error: {e}")
             return False
     
+    def delete_sessions_for_users(self, user_ids: List[int]) -> int:
+        """Log out every session belonging to the given users in one transaction"""
+        unique_ids = sorted({uid for uid in user_ids if uid})
+        if not unique_ids:
+            return 0
+        with self._session_cache_lock:
+            self._session_cache.clear()
+        try:
+            placeholders = ",".join("?" * len(unique_ids))
+            with self._conn() as conn:
+                cursor = conn.execute(
+                    f"DELETE FROM sessions WHERE user_id IN ({placeholders})", unique_ids
+                )
+            return cursor.rowcount
+        except Exception as e:
+            print(f"Bulk logout error: {e}")
+            return 0
+
+    def set_users_active(self, user_ids: List[int], is_active: bool) -> int:
+        """Activate or deactivate many users at once; deactivation also ends their sessions"""
+        unique_ids = sorted({uid for uid in user_ids if uid})
+        if not unique_ids:
+            return 0
+        with self._session_cache_lock:
+            self._session_cache.clear()
+        try:
+            placeholders = ",".join("?" * len(unique_ids))
+            with self._conn() as conn:
+                cursor = conn.execute(
+                    f"UPDATE users SET is_active = ? WHERE id IN ({placeholders})",
+                    [int(is_active), *unique_ids]
+                )
+                updated = cursor.rowcount
+                if not is_active:
+                    conn.execute(
+                        f"DELETE FROM sessions WHERE user_id IN ({placeholders})", unique_ids
+                    )
+            return updated
+        except Exception as e:
+            print(f"Bulk user update error: {e}")
+            return 0
+
     def cleanup_expired_sessions(self):
         """Remove expired sessions from database"""
+        with self._session_cache_lock:
+            self._session_cache.clear()
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            cursor.execute("DELETE FROM sessions WHERE expires_at < CURRENT_TIMESTAMP")
-            deleted = cursor.rowcount
-            conn.commit()
-            conn.close()
-            return deleted
+            with self._conn() as conn:
+                cursor = conn.execute("DELETE FROM sessions WHERE expires_at < ?", (int(time.time()),))
+            return cursor.rowcount
         except Exception as e:
             print(f"Session cleanup error: {e}")
             return 0
@@ -278,7 +430,7 @@ class AuthManager:
             if len(new_password) < 6:
                 return False, "New password must be at least 6 characters long"
             
-            conn = sqlite3.connect(self.db_path)
+            conn = self._conn()
             cursor = conn.cursor()
             
             # Verify old password
@@ -286,19 +438,15 @@ class AuthManager:
             result = cursor.fetchone()
             
             if not result:
-                conn.close()
                 return False, "User not found"
             
-            old_hash = self._hash_password(old_password)
-            if old_hash != result[0]:
-                conn.close()
+            if not self._verify_password(old_password, result[0]):
                 return False, "Current password is incorrect"
             
             # Update password
             new_hash = self._hash_password(new_password)
-            cursor.execute("UPDATE users SET password_hash = ? WHERE id = ?", (new_hash, user_id))
-            conn.commit()
-            conn.close()
+            with conn:
+                cursor.execute("UPDATE users SET password_hash = ? WHERE id = ?", (new_hash, user_id))
             
             return True, "Password changed successfully"
             
@@ -308,45 +456,50 @@ class AuthManager:
     def get_user_info(self, user_id: int) -> Optional[Dict]:
         """Get user information by ID"""
         try:
-            conn = sqlite3.connect(self.db_path)
-            conn.row_factory = sqlite3.Row
-            cursor = conn.cursor()
+            cursor = self._conn().cursor()
             
-            cursor.execute("SELECT * FROM users WHERE id = ?", (user_id,))
+            cursor.execute(f"SELECT {USER_COLUMNS} FROM users WHERE id = ?", (user_id,))
             user = cursor.fetchone()
-            conn.close()
-            
-            if user:
-                return {
-                    'id': user['id'],
-                    'username': user['username'],
-                    'email': user['email'],
-                    'full_name': user['full_name'],
-                    'role': user['role'],
-                    'created_at': user['created_at'],
-                    'last_login': user['last_login']
-                }
-            return None
+            
+            return dict(user) if user else None
             
         except Exception as e:
             print(f"Get user info error: {e}")
             return None
     
+    def get_users_by_ids(self, user_ids: List[int]) -> Dict[int, Dict]:
+        """Get user information for many IDs with a single query"""
+        unique_ids = sorted({uid for uid in user_ids if uid})
+        if not unique_ids:
+            return {}
+        
+        try:
+            placeholders = ",".join("?" * len(unique_ids))
+            cursor = self._conn().execute(f"""
+                SELECT {USER_COLUMNS}
+                FROM users
+                WHERE id IN ({placeholders})
+            """, unique_ids)
+            
+            # Zip with the known column tuple instead of dict(row) walking Row.keys()
+            return {row['id']: dict(zip(USER_FIELDS, row)) for row in cursor}
+            
+        except Exception as e:
+            print(f"Get users by ids error: {e}")
+            return {}
+    
     def get_all_users(self) -> list:
         """Get all users (admin only)"""
         try:
-            conn = sqlite3.connect(self.db_path)
-            conn.row_factory = sqlite3.Row
-            cursor = conn.cursor()
+            cursor = self._conn().cursor()
             
-            cursor.execute("""
-                SELECT id, username, email, full_name, role, is_active, created_at, last_login
+            cursor.execute(f"""
+                SELECT {ADMIN_USER_COLUMNS}
                 FROM users
                 ORDER BY created_at DESC
             """)
             
-            users = [dict(row) for row in cursor.fetchall()]
-            conn.close()
+            users = [dict(zip(ADMIN_USER_FIELDS, row)) for row in cursor]
             
             return users
             
@@ -1,31 +1,104 @@
 """
 JSON-based chat history storage system
-Each user's chat history is stored in a separate JSON file
+Each user's chat history is stored in a separate JSON Lines file (one chat per line).
+Set CHAT_STORAGE_BACKEND=sqlite to keep all histories in one SQLite table instead.
 """
-import json
 import os
+import shutil
+import sqlite3
+import threading
+import time
 from datetime import datetime
 from pathlib import Path
 from typing import List, Dict, Optional
 
+import orjson
+
+# Compact UTF-8 output, one entry per line
+_DUMP_OPTIONS = orjson.OPT_APPEND_NEWLINE | orjson.OPT_NON_STR_KEYS
+
+
+def _tail_lines(file_path: Path, n: int, chunk_size: int = 8192) -> List[bytes]:
+    """Return the last n non-empty lines of a file, reading backwards from the end"""
+    with open(file_path, 'rb') as f:
+        pos = f.seek(0, os.SEEK_END)
+        chunks = []
+        newlines = 0
+        while pos > 0:
+            read_size = min(chunk_size, pos)
+            pos -= read_size
+            f.seek(pos)
+            chunk = f.read(read_size)
+            chunks.append(chunk)
+            newlines += chunk.count(b"\n")
+            # Need n + 1 newlines so the oldest kept line is known to be complete;
+            # blank lines do not count, so keep reading back if they took part of that
+            if newlines > n:
+                lines = _non_empty_lines(chunks, partial_first=pos > 0)
+                if len(lines) >= n:
+                    return lines[-n:]
+    return _non_empty_lines(chunks, partial_first=False)[-n:]
+
+
+def _non_empty_lines(reversed_chunks: List[bytes], partial_first: bool) -> List[bytes]:
+    """Join chunks read back-to-front and split them into non-empty lines"""
+    lines = b"".join(reversed(reversed_chunks)).splitlines()
+    if partial_first:
+        # First line starts mid-record
+        lines = lines[1:]
+    return [line for line in lines if line.strip()]
+
+
+def _format_timestamp(timestamp):
+    """Return a stored timestamp as ISO text; epoch seconds are shown in local time like older entries"""
+    if isinstance(timestamp, (int, float)):
+        return datetime.fromtimestamp(timestamp).isoformat()
+    return timestamp
+
 
 class ChatStorage:
-    """Manages chat history storage as JSON files per user"""
+    """Manages chat history storage as JSON Lines files per user"""
     
     def __init__(self, storage_dir: str = "data/chat_history"):
         """
         Initialize chat storage
         
         Args:
-            storage_dir: Directory to store user chat history JSON files
+            storage_dir: Directory to store user chat history JSONL files
         """
         self.storage_dir = Path(storage_dir)
         self.storage_dir.mkdir(parents=True, exist_ok=True)
+        # Per-user chat counts, filled lazily and bumped on every save
+        self._counts: Dict[int, int] = {}
+        self._lock = threading.Lock()
+        self._migrate_legacy_files()
         print(f"Chat storage initialized at: {self.storage_dir}")
     
     def _get_user_file(self, user_id: int) -> Path:
-        """Get the JSON file path for a specific user"""
-        return self.storage_dir / f"user_{user_id}_history.json"
+        """Get the JSONL file path for a specific user"""
+        return self.storage_dir / f"user_{user_id}_history.jsonl"
+    
+    def _migrate_legacy_files(self):
+        """Convert old whole-file JSON histories into append-only JSONL files"""
+        for legacy_path in self.storage_dir.glob("user_*_history.json"):
+            try:
+                with open(legacy_path, 'rb') as f:
+                    history = orjson.loads(f.read())
+                with open(legacy_path.with_suffix('.jsonl'), 'ab') as f:
+                    f.write(b"".join(orjson.dumps(entry, option=_DUMP_OPTIONS) for entry in history))
+                legacy_path.unlink()
+                print(f"✓ Migrated chat history {legacy_path.name} to JSONL")
+            except Exception as e:
+                print(f"✗ Error migrating {legacy_path.name}: {e}")
+    
+    def _read_entries(self, file_path: Path, limit: Optional[int] = None) -> List[Dict]:
+        """Read chat entries in file order, keeping only the last `limit` if given"""
+        if limit:
+            lines = _tail_lines(file_path, limit)
+        else:
+            with open(file_path, 'rb') as f:
+                lines = f.readlines()
+        return [orjson.loads(line) for line in lines if line.strip()]
     
     def save_chat(
         self,
@@ -51,29 +124,26 @@ class ChatStorage:
         try:
             file_path = self._get_user_file(user_id)
             
-            # Load existing history
-            history = []
-            if file_path.exists():
-                with open(file_path, 'r', encoding='utf-8') as f:
-                    history = json.load(f)
-            
-            # Create new chat entry
-            chat_entry = {
-                'id': len(history) + 1,
-                'session_id': session_id,
-                'question': question,
-                'answer': answer,
-                'sources': sources or [],
-                'timestamp': datetime.now().isoformat()
-            }
-            
-            # Append and save
-            history.append(chat_entry)
-            
-            with open(file_path, 'w', encoding='utf-8') as f:
-                json.dump(history, f, ensure_ascii=False, indent=2)
-            
-            print(f"✓ Saved chat for user {user_id} (total: {len(history)} messages)")
+            with self._lock:
+                count = self.get_user_chat_count(user_id)
+                
+                # Create new chat entry
+                chat_entry = {
+                    'id': count + 1,
+                    'session_id': session_id,
+                    'question': question,
+                    'answer': answer,
+                    'sources': sources or [],
+                    # Unix epoch seconds; get_user_history returns it as ISO text like older entries
+                    'timestamp': int(time.time())
+                }
+                
+                # Append a single line instead of rewriting the whole history
+                with open(file_path, 'ab') as f:
+                    f.write(orjson.dumps(chat_entry, option=_DUMP_OPTIONS))
+                self._counts[user_id] = count + 1
+            
+            print(f"✓ Saved chat for user {user_id} (total: {count + 1} messages)")
             return True
             
         except Exception as e:
@@ -92,22 +162,17 @@ class ChatStorage:
             List of chat entries (most recent first)
         """
         try:
-            file_path = self._get_user_file(user_id)
-            
-            if not file_path.exists():
-                return []
-            
-            with open(file_path, 'r', encoding='utf-8') as f:
-                history = json.load(f)
+            history = self._read_entries(self._get_user_file(user_id), limit)
+            for entry in history:
+                entry['timestamp'] = _format_timestamp(entry.get('timestamp'))
             
             # Return most recent first
             history.reverse()
             
-            if limit:
-                history = history[:limit]
-            
             return history
             
+        except FileNotFoundError:
+            return []
         except Exception as e:
             print(f"✗ Error loading history for user {user_id}: {e}")
             return []
@@ -123,16 +188,17 @@ class ChatStorage:
             int: Number of chat interactions
         """
         try:
-            file_path = self._get_user_file(user_id)
-            
-            if not file_path.exists():
-                return 0
+            if user_id in self._counts:
+                return self._counts[user_id]
             
-            with open(file_path, 'r', encoding='utf-8') as f:
-                history = json.load(f)
+            with open(self._get_user_file(user_id), 'rb') as f:
+                count = sum(1 for line in f if line.strip())
             
-            return len(history)
+            self._counts[user_id] = count
+            return count
             
+        except FileNotFoundError:
+            return 0
         except Exception as e:
             print(f"✗ Error counting chats for user {user_id}: {e}")
             return 0
@@ -150,9 +216,13 @@ class ChatStorage:
         try:
             file_path = self._get_user_file(user_id)
             
-            if file_path.exists():
-                file_path.unlink()
-                print(f"✓ Cleared history for user {user_id}")
+            with self._lock:
+                try:
+                    file_path.unlink()
+                    print(f"✓ Cleared history for user {user_id}")
+                except FileNotFoundError:
+                    pass
+                self._counts.pop(user_id, None)
             
             return True
             
@@ -188,11 +258,15 @@ class ChatStorage:
         """
         try:
             user_ids = []
-            for file_path in self.storage_dir.glob("user_*_history.json"):
-                # Extract user_id from filename like "user_1_history.json"
-                filename = file_path.stem  # Gets "user_1_history"
-                user_id_str = filename.split('_')[1]  # Gets "1"
-                user_ids.append(int(user_id_str))
+            prefix, suffix = "user_", "_history.jsonl"
+            with os.scandir(self.storage_dir) as it:
+                for entry in it:
+                    name = entry.name
+                    if name.startswith(prefix) and name.endswith(suffix):
+                        # "user_1_history.jsonl" -> "1"
+                        user_id_str = name[len(prefix):-len(suffix)]
+                        if user_id_str.isdigit():
+                            user_ids.append(int(user_id_str))
             
             return sorted(user_ids)
             
@@ -206,7 +280,7 @@ class ChatStorage:
         
         Args:
             user_id: User ID
-            export_path: Path to export the JSON file
+            export_path: Path to export the JSONL file
             
         Returns:
             bool: True if exported successfully
@@ -214,19 +288,171 @@ class ChatStorage:
         try:
             file_path = self._get_user_file(user_id)
             
-            if not file_path.exists():
-                print(f"No history found for user {user_id}")
-                return False
-            
-            import shutil
             shutil.copy2(file_path, export_path)
             print(f"✓ Exported history for user {user_id} to {export_path}")
             return True
             
+        except FileNotFoundError:
+            print(f"No history found for user {user_id}")
+            return False
+        except Exception as e:
+            print(f"✗ Error exporting history: {e}")
+            return False
+
+
+
+class SQLiteChatStorage:
+    """Manages chat history in a single SQLite table (same interface as ChatStorage)"""
+    
+    def __init__(self, storage_dir: str = "data/chat_history"):
+        """
+        Initialize chat storage
+        
+        Args:
+            storage_dir: Directory holding the chat_history.db file
+        """
+        self.storage_dir = Path(storage_dir)
+        self.storage_dir.mkdir(parents=True, exist_ok=True)
+        self.db_path = str(self.storage_dir / "chat_history.db")
+        self._local = threading.local()
+        self._init_database()
+        print(f"Chat storage initialized at: {self.db_path}")
+    
+    def _conn(self) -> sqlite3.Connection:
+        """Return this thread's long-lived connection, opening it on first use"""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, check_same_thread=False, isolation_level="IMMEDIATE")
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+    
+    def _init_database(self):
+        """Create the chats table and its lookup indexes"""
+        with self._conn() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS chats (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    user_id INTEGER NOT NULL,
+                    session_id TEXT,
+                    ts INTEGER NOT NULL,
+                    question TEXT NOT NULL,
+                    answer TEXT NOT NULL,
+                    sources BLOB
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_chats_user ON chats(user_id, id)")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_chats_user_session ON chats(user_id, session_id, id)")
+    
+    @staticmethod
+    def _row_to_entry(row: tuple) -> Dict:
+        """Map a chats row to the entry dict used by ChatStorage"""
+        chat_id, session_id, ts, question, answer, sources = row
+        return {
+            'id': chat_id,
+            'session_id': session_id,
+            'question': question,
+            'answer': answer,
+            'sources': orjson.loads(sources) if sources else [],
+            'timestamp': _format_timestamp(ts)
+        }
+    
+    def save_chat(
+        self,
+        user_id: int,
+        question: str,
+        answer: str,
+        sources: Optional[List[Dict]] = None,
+        session_id: Optional[str] = None
+    ) -> bool:
+        """Save a chat interaction with a single INSERT"""
+        try:
+            with self._conn() as conn:
+                conn.execute(
+                    "INSERT INTO chats (user_id, session_id, ts, question, answer, sources) VALUES (?, ?, ?, ?, ?, ?)",
+                    (user_id, session_id, int(time.time()), question, answer,
+                     orjson.dumps(sources or [], option=orjson.OPT_NON_STR_KEYS))
+                )
+            print(f"✓ Saved chat for user {user_id}")
+            return True
+        except Exception as e:
+            print(f"✗ Error saving chat for user {user_id}: {e}")
+            return False
+    
+    def get_user_history(self, user_id: int, limit: Optional[int] = None) -> List[Dict]:
+        """Get chat history for a user (most recent first)"""
+        try:
+            cursor = self._conn().execute(
+                "SELECT id, session_id, ts, question, answer, sources FROM chats "
+                "WHERE user_id = ? ORDER BY id DESC LIMIT ?",
+                (user_id, limit or -1)
+            )
+            return [self._row_to_entry(row) for row in cursor.fetchall()]
+        except Exception as e:
+            print(f"✗ Error loading history for user {user_id}: {e}")
+            return []
+    
+    def get_user_chat_count(self, user_id: int) -> int:
+        """Get total number of chats for a user"""
+        try:
+            cursor = self._conn().execute("SELECT COUNT(*) FROM chats WHERE user_id = ?", (user_id,))
+            return cursor.fetchone()[0]
+        except Exception as e:
+            print(f"✗ Error counting chats for user {user_id}: {e}")
+            return 0
+    
+    def clear_user_history(self, user_id: int) -> bool:
+        """Clear all chat history for a user"""
+        try:
+            with self._conn() as conn:
+                conn.execute("DELETE FROM chats WHERE user_id = ?", (user_id,))
+            print(f"✓ Cleared history for user {user_id}")
+            return True
+        except Exception as e:
+            print(f"✗ Error clearing history for user {user_id}: {e}")
+            return False
+    
+    def get_session_history(self, user_id: int, session_id: str) -> List[Dict]:
+        """Get chat history for a specific session (most recent first), filtered in SQL"""
+        try:
+            cursor = self._conn().execute(
+                "SELECT id, session_id, ts, question, answer, sources FROM chats "
+                "WHERE user_id = ? AND session_id = ? ORDER BY id DESC",
+                (user_id, session_id)
+            )
+            return [self._row_to_entry(row) for row in cursor.fetchall()]
+        except Exception as e:
+            print(f"✗ Error loading session history: {e}")
+            return []
+    
+    def get_all_users(self) -> List[int]:
+        """Get list of all user IDs that have chat history"""
+        try:
+            cursor = self._conn().execute("SELECT DISTINCT user_id FROM chats ORDER BY user_id")
+            return [row[0] for row in cursor.fetchall()]
+        except Exception as e:
+            print(f"✗ Error getting user list: {e}")
+            return []
+    
+    def export_user_history(self, user_id: int, export_path: str) -> bool:
+        """Export a user's chat history as a JSONL file (oldest first)"""
+        try:
+            history = self.get_user_history(user_id)
+            if not history:
+                print(f"No history found for user {user_id}")
+                return False
+            with open(export_path, 'wb') as f:
+                f.write(b"".join(orjson.dumps(entry, option=_DUMP_OPTIONS) for entry in reversed(history)))
+            print(f"✓ Exported history for user {user_id} to {export_path}")
+            return True
         except Exception as e:
             print(f"✗ Error exporting history: {e}")
             return False
 
 
 # Global instance
-chat_storage = ChatStorage()
+if os.environ.get('CHAT_STORAGE_BACKEND', 'jsonl').lower() == 'sqlite':
+    chat_storage = SQLiteChatStorage()
+else:
+    chat_storage = ChatStorage()
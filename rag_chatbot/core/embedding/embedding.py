@@ -1,42 +1,53 @@
 import os
+import threading
 import requests
 import torch
 from llama_index.embeddings.huggingface import HuggingFaceEmbedding
 from llama_index.embeddings.openai import OpenAIEmbedding
-from ...setting import RAGSettings
+from ...setting import RAGSettings, get_settings
 from dotenv import load_dotenv
 
 
 load_dotenv()
 
+# Embedding models loaded in this process, shared by the ingestion and query paths
+_embed_models = {}
+_embed_models_lock = threading.Lock()
+
 
 class LocalEmbedding:
     @staticmethod
     def set(setting: RAGSettings | None = None, **kwargs):
-        setting = setting or RAGSettings()
+        setting = setting or get_settings()
         model_name = setting.ingestion.embed_llm
-        if model_name != "text-embedding-ada-002":
-            # Use GPU if available
-            device = "cuda" if torch.cuda.is_available() else "cpu"
-            return HuggingFaceEmbedding(
-                model_name=model_name,
-                cache_folder=os.path.join(os.getcwd(), setting.ingestion.cache_folder),
-                trust_remote_code=True,
-                embed_batch_size=setting.ingestion.embed_batch_size,
-                device=device,
-            )
-        else:
-            return OpenAIEmbedding()
+        cache_folder = os.path.join(os.getcwd(), setting.ingestion.cache_folder)
+        key = (model_name, cache_folder, setting.ingestion.embed_batch_size)
+        # Loading under the lock keeps concurrent callers from initializing the same weights twice
+        with _embed_models_lock:
+            if key not in _embed_models:
+                if model_name != "text-embedding-ada-002":
+                    # Use GPU if available
+                    device = "cuda" if torch.cuda.is_available() else "cpu"
+                    _embed_models[key] = HuggingFaceEmbedding(
+                        model_name=model_name,
+                        cache_folder=cache_folder,
+                        trust_remote_code=True,
+                        embed_batch_size=setting.ingestion.embed_batch_size,
+                        device=device,
+                    )
+                else:
+                    _embed_models[key] = OpenAIEmbedding()
+            return _embed_models[key]
 
     @staticmethod
     def pull(host: str, **kwargs):
-        setting = RAGSettings()
+        setting = get_settings()
         payload = {"name": setting.ingestion.embed_llm}
         return requests.post(f"http://{host}:11434/api/pull", json=payload, stream=True)
 
     @staticmethod
     def check_model_exist(host: str, **kwargs) -> bool:
-        setting = RAGSettings()
+        setting = get_settings()
         data = requests.get(f"http://{host}:11434/api/tags").json()
         list_model = [d["name"] for d in data["models"]]
         if setting.ingestion.embed_llm in list_model:
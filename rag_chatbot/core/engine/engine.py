@@ -4,7 +4,7 @@ from llama_index.core.llms.llm import LLM
 from llama_index.core.schema import BaseNode
 from typing import List
 from .retriever import LocalRetriever
-from ...setting import RAGSettings
+from ...setting import RAGSettings, get_settings
 
 
 class LocalChatEngine:
@@ -12,7 +12,7 @@ class LocalChatEngine:
         self, setting: RAGSettings | None = None, host: str = "host.docker.internal"
     ):
         super().__init__()
-        self._setting = setting or RAGSettings()
+        self._setting = setting or get_settings()
         self._retriever = LocalRetriever(self._setting)
         self._host = host
 
@@ -16,7 +16,7 @@ from llama_index.core.llms.llm import LLM
 from llama_index.retrievers.bm25 import BM25Retriever
 from llama_index.core import Settings, VectorStoreIndex
 from ..prompt import get_query_gen_prompt
-from ...setting import RAGSettings
+from ...setting import RAGSettings, get_settings
 
 load_dotenv()
 
@@ -52,7 +52,7 @@ class TwoStageRetriever(QueryFusionRetriever):
             object_map,
             retriever_weights,
         )
-        self._setting = setting or RAGSettings()
+        self._setting = setting or get_settings()
         self._rerank_model = SentenceTransformerRerank(
             top_n=self._setting.retriever.top_k_rerank,
             model=self._setting.retriever.rerank_llm,
@@ -85,7 +85,7 @@ class LocalRetriever:
         self, setting: RAGSettings | None = None, host: str = "host.docker.internal"
     ):
         super().__init__()
-        self._setting = setting or RAGSettings()
+        self._setting = setting or get_settings()
         self._host = host
 
     def _get_normal_retriever(
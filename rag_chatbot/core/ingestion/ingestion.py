@@ -2,24 +2,283 @@ import re
 import fitz
 import os
 import pickle
+import orjson
 import hashlib
+import mmap
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from pathlib import Path
 from llama_index.core import Document, Settings
-from llama_index.core.schema import BaseNode
+from llama_index.core.schema import BaseNode, TextNode
 from llama_index.core.node_parser import SentenceSplitter
 from dotenv import load_dotenv
 from typing import Any, List
 from tqdm import tqdm
-from ...setting import RAGSettings
+from ...setting import RAGSettings, get_settings
 
 load_dotenv()
 
+# Characters kept by _filter_text: ASCII letters/digits/punctuation, space and Vietnamese letters
+_ALLOWED_CHARS = (
+    "abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789 "
+    "`~!@#$%^&*()_-+=[]{}|\\;:'\",.<>/?"
+)
+_ALLOWED_CODEPOINTS = (
+    [ord(c) for c in _ALLOWED_CHARS]
+    + list(range(0x00C0, 0x01B1))
+    + list(range(0x1EA0, 0x1EFA))
+)
+
+
+class _FilterTable(dict):
+    """str.translate table: allowed code points map to themselves, anything else to a space"""
+
+    def __missing__(self, codepoint):
+        # Memoize so each disallowed code point costs one Python call per process
+        self[codepoint] = " "
+        return " "
+
+
+_FILTER_TABLE = _FilterTable((cp, cp) for cp in _ALLOWED_CODEPOINTS)
+
+# The only ASCII characters _filter_text drops that str.split() would not already treat as whitespace
+_ASCII_CONTROL_RE = re.compile(r'[\x00-\x08\x0e-\x1b\x7f]')
+
+
+# Plain text extraction: no image decoding, ligatures expanded, hyphenated line breaks joined
+_PDF_TEXT_FLAGS = fitz.TEXT_DEHYPHENATE | fitz.TEXT_MEDIABOX_CLIP
+# Minimum pages per process when splitting one long PDF across workers
+_PDF_PAGES_PER_SEGMENT = 16
+
+# Pages with less extracted text than this are treated as scanned and sent to OCR
+_OCR_PAGE_MIN_CHARS = 30
+
+# Per-process splitter for pool workers, set up by _init_ingestion_worker
+_worker_splitter = None
+
+
+def _process_pool_allowed(use_processes: bool) -> bool:
+    """Whether reading may fork worker processes: only when the caller opts in from the main thread"""
+    # Forking while other threads hold locks (request threads, the DB write buffer, HTTP pools)
+    # can deadlock the child, so request paths always read in-process; spawn is not an option
+    # either, as it would re-import the (unguarded) entry scripts
+    return (
+        use_processes
+        and threading.current_thread() is threading.main_thread()
+        and "fork" in multiprocessing.get_all_start_methods()
+    )
+
+
+def _build_splitter(config: tuple) -> SentenceSplitter:
+    """Build the sentence splitter from (chunk_size, chunk_overlap, paragraph_sep, chunking_regex)"""
+    chunk_size, chunk_overlap, paragraph_sep, chunking_regex = config
+    return SentenceSplitter.from_defaults(
+        chunk_size=chunk_size,
+        chunk_overlap=chunk_overlap,
+        paragraph_separator=paragraph_sep,
+        secondary_chunking_regex=chunking_regex,
+    )
+
+
+def _init_ingestion_worker(splitter_config: tuple) -> None:
+    """Build the splitter once per worker process"""
+    global _worker_splitter
+    _worker_splitter = _build_splitter(splitter_config)
+
+
+def _ingest_one(task: tuple[str, str]) -> List[BaseNode] | None:
+    """Read, filter and split one file in a pool worker (no embedding)"""
+    input_file, file_name = task
+    return _read_and_split(input_file, file_name, _worker_splitter)
+
+
+def _extract_pdf_pages(segment: tuple) -> list:
+    """Extract filtered (page_num, text) tuples for pages [start, stop) of a PDF path or open document"""
+    source, start, stop = segment
+    document = fitz.open(source) if isinstance(source, str) else source
+    try:
+        return [
+            (page.number + 1, _filter_text(
+                page.get_text("text", flags=_PDF_TEXT_FLAGS, sort=False)
+            ))
+            for page in document.pages(start, stop)
+        ]
+    finally:
+        if document is not source:
+            document.close()
+
+
+def _filter_text(text):
+    # Fast path: clean ASCII (isascii() is O(1)) only needs whitespace collapsed
+    if text.isascii() and not _ASCII_CONTROL_RE.search(text):
+        return " ".join(text.split())
+    # Replace disallowed characters with spaces in one C-level pass,
+    # then collapse whitespace runs
+    return " ".join(text.translate(_FILTER_TABLE).split())
+
+
+def _read_pdf(
+    file_path: str, executor: ProcessPoolExecutor | None = None, pdf_workers: int = 1
+) -> list:
+    """Read text from PDF file, returns list of (page_num, text) tuples"""
+    document = fitz.open(file_path)
+    page_count = document.page_count
+    num_workers = min(pdf_workers, page_count // _PDF_PAGES_PER_SEGMENT) if executor else 1
+    # Long PDFs are split into page ranges across the caller's process pool;
+    # MuPDF is not thread-safe, so each process opens its own document
+    if num_workers > 1 and not document.needs_pass:
+        document.close()
+        step = -(-page_count // num_workers)
+        segments = [(file_path, start, min(start + step, page_count)) for start in range(0, page_count, step)]
+        pages_data = [page for segment in executor.map(_extract_pdf_pages, segments) for page in segment]
+    else:
+        pages_data = _extract_pdf_pages((document, 0, page_count))
+        document.close()
+
+    # Check if we got any text (filtered pages carry no surrounding whitespace)
+    total_chars = sum(len(text) for _, text in pages_data)
+    if total_chars < 100:  # Very little text extracted
+        print(f"⚠️  Warning: PDF appears to be image-based. Attempting OCR...")
+        try:
+            # Try OCR if available
+            import pytesseract
+            from PIL import Image
+
+            # OCR only the pages without a usable text layer, rendered at 150 DPI grayscale
+            ocr_pages = [page_num for page_num, text in pages_data if len(text) < _OCR_PAGE_MIN_CHARS]
+            document = fitz.open(file_path)
+            try:
+                images = []
+                for page_num in ocr_pages:
+                    pix = document[page_num - 1].get_pixmap(dpi=150, colorspace=fitz.csGRAY)
+                    images.append(Image.frombytes("L", (pix.width, pix.height), pix.samples))
+            finally:
+                document.close()
+
+            # pytesseract runs one tesseract subprocess per page, so threads overlap them
+            print(f"   OCR processing {len(ocr_pages)}/{len(pages_data)} pages...")
+            with ThreadPoolExecutor(max_workers=min(8, os.cpu_count() or 1)) as executor:
+                ocr_texts = executor.map(pytesseract.image_to_string, images)
+                ocr_by_page = {
+                    page_num: _filter_text(text)
+                    for page_num, text in zip(ocr_pages, ocr_texts)
+                }
+            pages_data = [(page_num, ocr_by_page.get(page_num, text)) for page_num, text in pages_data]
+
+            print(f"   ✓ OCR completed: {sum(len(t) for _, t in pages_data)} characters extracted")
+
+        except ImportError:
+            print(f"   ✗ OCR not available. Please install Tesseract OCR.")
+            print(f"   See OCR_SETUP.md for installation instructions.")
+            print(f"   Returning empty data for this PDF.")
+            return []
+        except Exception as e:
+            print(f"   ✗ OCR failed: {e}")
+            print(f"   Returning empty data for this PDF.")
+            return []
+
+    return pages_data
+
+
+def _read_txt(file_path: str) -> str:
+    """Read text from TXT or Markdown file"""
+    with open(file_path, 'r', encoding='utf-8') as f:
+        text = f.read()
+    return _filter_text(text)
+
+
+def _read_docx(file_path: str) -> str:
+    """Read text from DOCX file"""
+    try:
+        from docx import Document as DocxDocument
+        doc = DocxDocument(file_path)
+        parts = [para.text for para in doc.paragraphs if para.text]
+        # Include table text too; merged cells repeat across a row, so skip repeats
+        for table in doc.tables:
+            for row in table.rows:
+                previous = None
+                for cell in row.cells:
+                    if cell.text and cell.text != previous:
+                        parts.append(cell.text)
+                    previous = cell.text
+        return _filter_text(" ".join(parts))
+    except ImportError:
+        raise ImportError("python-docx is required to read DOCX files. Install with: pip install python-docx")
+
+
+def _read_file(file_path: str) -> str:
+    """Read text from file based on extension"""
+    ext = Path(file_path).suffix.lower()
+
+    if ext == '.pdf':
+        return _read_pdf(file_path)
+    elif ext in ['.txt', '.md', '.markdown']:
+        return _read_txt(file_path)
+    elif ext == '.docx':
+        return _read_docx(file_path)
+    else:
+        raise ValueError(f"Unsupported file type: {ext}")
+
+
+def _read_and_split(
+    input_file: str,
+    file_name: str,
+    splitter: SentenceSplitter,
+    executor: ProcessPoolExecutor | None = None,
+    pdf_workers: int = 1,
+) -> List[BaseNode] | None:
+    """Read one file and split it into nodes; returns None if nothing could be extracted"""
+    try:
+        # Check file type
+        ext = Path(input_file).suffix.lower()
+
+        if ext == '.pdf':
+            # Read PDF with page information
+            pages_data = _read_pdf(input_file, executor, pdf_workers)
+
+            if not pages_data:
+                print(f"No content extracted from {file_name}")
+                return None
+
+            # One Document per page keeps page boundaries; chunks inherit each page's metadata
+            docs = [
+                Document(
+                    text=page_text,
+                    metadata={
+                        "file_name": file_name,
+                        "page_label": str(page_num),
+                    },
+                )
+                for page_num, page_text in pages_data
+                if page_text.strip()  # Only add pages with content
+            ]
+            # Split all pages in a single batch
+            nodes = splitter(docs, show_progress=False)
+        else:
+            # Read other file types (returns string)
+            all_text = _read_file(input_file)
+
+            document = Document(
+                text=all_text,
+                metadata={
+                    "file_name": file_name,
+                },
+            )
+            nodes = splitter([document], show_progress=False)
+        return nodes
+    except Exception as e:
+        print(f"Error processing {file_name}: {e}")
+        return None
+
 
 class LocalDataIngestion:
     def __init__(self, setting: RAGSettings | None = None) -> None:
-        self._setting = setting or RAGSettings()
+        self._setting = setting or get_settings()
         self._node_store = {}
         self._ingested_file = []
+        self._splitter = None
+        self._splitter_key = None
         # Set up cache directory for persistent storage
         self._cache_dir = os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', '..', 'data', 'cache'))
         os.makedirs(self._cache_dir, exist_ok=True)
@@ -45,56 +304,148 @@ class LocalDataIngestion:
             print(f"[CACHE] Warning: Could not save cache index: {e}")
 
     def _get_file_hash(self, file_path: str) -> str:
-        """Get MD5 hash of file contents to detect changes"""
-        hash_md5 = hashlib.md5()
+        """Get BLAKE2b hash of file contents to detect changes"""
+        hasher = hashlib.blake2b(digest_size=32)
         try:
             with open(file_path, "rb") as f:
-                for chunk in iter(lambda: f.read(4096), b""):
-                    hash_md5.update(chunk)
-            return hash_md5.hexdigest()
+                # mmap hands the whole file to update() in one call; empty files cannot be mapped
+                if os.fstat(f.fileno()).st_size:
+                    with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                        hasher.update(mm)
+            return hasher.hexdigest()
         except Exception:
             return ""
 
-    def _get_cache_path(self, file_name: str) -> str:
-        """Get the cache file path for a document"""
-        safe_name = file_name.replace('/', '_').replace('\\', '_')
-        return os.path.join(self._cache_dir, f"{safe_name}.pkl")
-
-    def _load_cached_nodes(self, file_name: str, file_path: str) -> List[BaseNode] | None:
-        """Load cached nodes if they exist and file hasn't changed"""
-        cache_path = self._get_cache_path(file_name)
-        
-        if not os.path.exists(cache_path):
+    def _get_file_stat(self, file_path: str) -> tuple | None:
+        """Get (size, mtime_ns) of a file, used to skip hashing unchanged files"""
+        try:
+            st = os.stat(file_path)
+            return (st.st_size, st.st_mtime_ns)
+        except OSError:
             return None
+
+    def _get_cache_path(self, file_hash: str) -> str:
+        """Get the cache file path (without extension) for a document's contents and the current settings"""
+        ingestion = self._setting.ingestion
+        safe_model = ingestion.embed_llm.replace('/', '_').replace('\\', '_')
+        return os.path.join(
+            self._cache_dir,
+            f"{file_hash}_{ingestion.chunk_size}_{ingestion.chunk_overlap}_{safe_model}",
+        )
+
+    def _write_node_cache(self, cache_path: str, nodes: List[BaseNode]) -> None:
+        """Write nodes as a zstd-compressed Arrow IPC file (node JSON + embedding columns), or pickle without pyarrow"""
+        try:
+            import numpy as np
+            import pyarrow as pa
+            from pyarrow import feather
+        except ImportError:
+            with open(f"{cache_path}.pkl", 'wb') as f:
+                pickle.dump(nodes, f)
+            return
         
-        # Check if file has changed since caching
-        current_hash = self._get_file_hash(file_path)
-        cached_hash = self._cache_index.get(file_name, {}).get('hash')
+        node_data = [orjson.dumps({**node.to_dict(), "embedding": None}) for node in nodes]
+        embeddings = [node.embedding for node in nodes]
+        dim = len(embeddings[0]) if embeddings and embeddings[0] else 0
+        columns = {"node": pa.array(node_data, type=pa.binary())}
+        if dim and all(embedding is not None and len(embedding) == dim for embedding in embeddings):
+            # One contiguous slab instead of a Python list per node
+            matrix = np.asarray(embeddings, dtype=np.float32)
+            if self._setting.ingestion.quantize_cached_embeddings:
+                # Symmetric int8 with one scale per row; cosine ranking is barely affected
+                scale = np.abs(matrix).max(axis=1) / 127.0
+                scale[scale == 0] = 1.0
+                matrix = np.round(matrix / scale[:, None]).astype(np.int8)
+                columns["embedding_scale"] = pa.array(scale.astype(np.float32))
+            columns["embedding"] = pa.FixedSizeListArray.from_arrays(pa.array(matrix.ravel()), dim)
+        else:
+            columns["embedding"] = pa.array(embeddings, type=pa.list_(pa.float32()))
+        table = pa.table(columns)
+        feather.write_feather(table, f"{cache_path}.arrow", compression="zstd", compression_level=3)
+
+    def _read_node_cache(self, cache_path: str) -> List[BaseNode] | None:
+        """Read nodes written by _write_node_cache; returns None if no cache file exists"""
+        if os.path.exists(f"{cache_path}.arrow"):
+            import numpy as np
+            from pyarrow import feather
+            
+            table = feather.read_table(f"{cache_path}.arrow", memory_map=True)
+            embedding_column = table.column("embedding").combine_chunks()
+            if table.num_rows and hasattr(embedding_column.type, "list_size"):
+                matrix = embedding_column.flatten().to_numpy().reshape(
+                    table.num_rows, embedding_column.type.list_size
+                )
+                if "embedding_scale" in table.column_names:
+                    # Dequantize int8 rows back to float32
+                    scale = table.column("embedding_scale").to_numpy()
+                    matrix = matrix.astype(np.float32) * scale[:, None]
+                vectors = matrix.tolist()
+            else:
+                vectors = embedding_column.to_pylist()
+            nodes = []
+            for data, vector in zip(table.column("node").to_pylist(), vectors):
+                node_dict = orjson.loads(data)
+                node_dict["embedding"] = vector
+                nodes.append(TextNode.from_dict(node_dict))
+            return nodes
+        if os.path.exists(f"{cache_path}.pkl"):
+            with open(f"{cache_path}.pkl", 'rb') as f:
+                return pickle.load(f)
+        return None
+
+    def _load_cached_nodes(self, file_name: str, file_path: str) -> tuple[List[BaseNode] | None, str, tuple | None]:
+        """
+        Load cached nodes if a cache exists for the file's current contents.
         
-        if current_hash != cached_hash:
-            print(f"[CACHE] File changed, reprocessing: {file_name}")
-            return None
+        Returns:
+            (nodes or None, file hash, file stat) - the hash and stat are reused by _save_cached_nodes
+        """
+        # An unchanged size/mtime reuses the recorded hash instead of re-reading the file
+        entry = self._cache_index.get(file_name, {})
+        current_stat = self._get_file_stat(file_path)
+        if current_stat is not None and entry.get('stat') == current_stat:
+            current_hash = entry['hash']
+        else:
+            current_hash = self._get_file_hash(file_path)
+            if not current_hash:
+                return None, current_hash, current_stat
         
+        # Caches are keyed by contents, so renamed or duplicated files still hit
         try:
-            with open(cache_path, 'rb') as f:
-                nodes = pickle.load(f)
-                print(f"[CACHE] Loaded {len(nodes)} cached nodes for: {file_name}")
-                return nodes
+            nodes = self._read_node_cache(self._get_cache_path(current_hash))
         except Exception as e:
             print(f"[CACHE] Could not load cache for {file_name}: {e}")
-            return None
+            return None, current_hash, current_stat
+        if nodes is None:
+            if entry:
+                print(f"[CACHE] File changed, reprocessing: {file_name}")
+            return None, current_hash, current_stat
+        
+        # The cache may have been written for the same contents under another name
+        for node in nodes:
+            node.metadata["file_name"] = file_name
+        if entry.get('hash') != current_hash or entry.get('stat') != current_stat:
+            self._cache_index[file_name] = {
+                'hash': current_hash,
+                'stat': current_stat,
+                'node_count': len(nodes)
+            }
+            self._save_cache_index()
+        print(f"[CACHE] Loaded {len(nodes)} cached nodes for: {file_name}")
+        return nodes, current_hash, current_stat
 
-    def _save_cached_nodes(self, file_name: str, file_path: str, nodes: List[BaseNode]):
-        """Save nodes to cache"""
-        cache_path = self._get_cache_path(file_name)
+    def _save_cached_nodes(self, file_name: str, file_hash: str, file_stat: tuple | None, nodes: List[BaseNode]):
+        """Save nodes to cache under the hash computed by _load_cached_nodes"""
+        if not file_hash:
+            return
         
         try:
-            with open(cache_path, 'wb') as f:
-                pickle.dump(nodes, f)
+            self._write_node_cache(self._get_cache_path(file_hash), nodes)
             
             # Update cache index with file hash
             self._cache_index[file_name] = {
-                'hash': self._get_file_hash(file_path),
+                'hash': file_hash,
+                'stat': file_stat,
                 'node_count': len(nodes)
             }
             self._save_cache_index()
@@ -102,194 +453,146 @@ class LocalDataIngestion:
         except Exception as e:
             print(f"[CACHE] Could not save cache for {file_name}: {e}")
 
-    def _filter_text(self, text):
-        # Define the regex pattern.
-        pattern = r'[a-zA-Z0-9 \u00C0-\u01B0\u1EA0-\u1EF9`~!@#$%^&*()_\-+=\[\]{}|\\;:\'",.<>/?]+'
-        matches = re.findall(pattern, text)
-        # Join all matched substrings into a single string
-        filtered_text = " ".join(matches)
-        # Normalize the text by removing extra whitespaces
-        normalized_text = re.sub(r"\s+", " ", filtered_text.strip())
-
-        return normalized_text
-    
-    def _read_pdf(self, file_path: str) -> list:
-        """Read text from PDF file, returns list of (page_num, text) tuples"""
-        document = fitz.open(file_path)
-        pages_data = []
-        
-        for page_num, page in enumerate(document, start=1):
-            page_text = page.get_text("text")
-            page_text = self._filter_text(page_text)
-            pages_data.append((page_num, page_text))
-        
-        document.close()
+    def _splitter_config(self) -> tuple:
+        """Chunking settings the splitter is built from; plain values, so they pickle to pool workers"""
+        ingestion = self._setting.ingestion
+        return (
+            ingestion.chunk_size,
+            ingestion.chunk_overlap,
+            ingestion.paragraph_sep,
+            ingestion.chunking_regex,
+        )
+
+    def _get_splitter(self) -> SentenceSplitter:
+        """Return the sentence splitter, rebuilt only when the chunking settings change"""
+        key = self._splitter_config()
+        if self._splitter is None or self._splitter_key != key:
+            self._splitter = _build_splitter(key)
+            self._splitter_key = key
+        return self._splitter
+
+    def _read_and_split_all(
+        self, pending: list[tuple[str, str]], splitter: SentenceSplitter, use_processes: bool = False
+    ) -> list:
+        """Read and split files, sharing one process pool when allowed"""
+        num_workers = self._setting.ingestion.num_workers if _process_pool_allowed(use_processes) else 1
+        if num_workers <= 1:
+            return [
+                _read_and_split(input_file, file_name, splitter)
+                for input_file, file_name in tqdm(pending, desc="Loading documents")
+            ]
+        with ProcessPoolExecutor(
+            max_workers=num_workers if len(pending) == 1 else min(num_workers, len(pending)),
+            mp_context=multiprocessing.get_context("fork"),
+            initializer=_init_ingestion_worker,
+            initargs=(self._splitter_config(),),
+        ) as executor:
+            if len(pending) == 1:
+                # A single file uses the pool for its page ranges when it is a long PDF
+                input_file, file_name = pending[0]
+                return [_read_and_split(input_file, file_name, splitter, executor, num_workers)]
+            results = executor.map(_ingest_one, pending, chunksize=4)
+            return list(tqdm(results, total=len(pending), desc="Loading documents"))
+
+    def _embed_files(self, split_files: list[tuple[str, str, List[BaseNode]]]) -> list:
+        """Embed the nodes of all files in one batched call and hand them back per file"""
+        all_nodes = [node for _, _, nodes in split_files for node in nodes]
+        if not all_nodes:
+            return split_files
+        # Sort by length so each embedding batch pads to similar sizes
+        order = sorted(range(len(all_nodes)), key=lambda i: len(all_nodes[i].get_content()))
+        try:
+            embedded = Settings.embed_model([all_nodes[i] for i in order], show_progress=True)
+        except Exception as e:
+            # One shared batch must not cost every file (e.g. a CUDA OOM); retry file by
+            # file and skip only the files that still fail
+            print(f"Error embedding documents in one batch, retrying per file: {e}")
+            return self._embed_files_one_by_one(split_files)
+        for position, i in enumerate(order):
+            all_nodes[i] = embedded[position]
         
-        # Check if we got any text
-        total_text = " ".join([text for _, text in pages_data])
-        if len(total_text.strip()) < 100:  # Very little text extracted
-            print(f"⚠️  Warning: PDF appears to be image-based. Attempting OCR...")
+        # Re-partition by file in the original order
+        embedded_files = []
+        offset = 0
+        for input_file, file_name, nodes in split_files:
+            embedded_files.append((input_file, file_name, all_nodes[offset:offset + len(nodes)]))
+            offset += len(nodes)
+        return embedded_files
+
+    def _embed_files_one_by_one(self, split_files: list[tuple[str, str, List[BaseNode]]]) -> list:
+        """Embed each file on its own, leaving out the files whose embedding fails"""
+        embedded_files = []
+        for input_file, file_name, nodes in split_files:
             try:
-                # Try OCR if available
-                import pytesseract
-                from pdf2image import convert_from_path
-                from PIL import Image
-                
-                # Convert PDF pages to images
-                images = convert_from_path(file_path)
-                pages_data = []
-                
-                for i, image in enumerate(images, start=1):
-                    print(f"   OCR processing page {i}/{len(images)}...")
-                    page_text = pytesseract.image_to_string(image)
-                    page_text = self._filter_text(page_text)
-                    pages_data.append((i, page_text))
-                
-                print(f"   ✓ OCR completed: {sum(len(t) for _, t in pages_data)} characters extracted")
-                
-            except ImportError:
-                print(f"   ✗ OCR not available. Please install Tesseract OCR.")
-                print(f"   See OCR_SETUP.md for installation instructions.")
-                print(f"   Returning empty data for this PDF.")
-                return []
+                if nodes:
+                    nodes = Settings.embed_model(nodes, show_progress=False)
+                embedded_files.append((input_file, file_name, nodes))
             except Exception as e:
-                print(f"   ✗ OCR failed: {e}")
-                print(f"   Returning empty data for this PDF.")
-                return []
-        
-        return pages_data
-    
-    def _read_txt(self, file_path: str) -> str:
-        """Read text from TXT or Markdown file"""
-        with open(file_path, 'r', encoding='utf-8') as f:
-            text = f.read()
-        return self._filter_text(text)
-    
-    def _read_docx(self, file_path: str) -> str:
-        """Read text from DOCX file"""
-        try:
-            from docx import Document as DocxDocument
-            doc = DocxDocument(file_path)
-            all_text = ""
-            for para in doc.paragraphs:
-                all_text += " " + para.text
-            return self._filter_text(all_text.strip())
-        except ImportError:
-            raise ImportError("python-docx is required to read DOCX files. Install with: pip install python-docx")
-    
-    def _read_file(self, file_path: str) -> str:
-        """Read text from file based on extension"""
-        ext = Path(file_path).suffix.lower()
-        
-        if ext == '.pdf':
-            return self._read_pdf(file_path)
-        elif ext in ['.txt', '.md', '.markdown']:
-            return self._read_txt(file_path)
-        elif ext == '.docx':
-            return self._read_docx(file_path)
-        else:
-            raise ValueError(f"Unsupported file type: {ext}")
+                print(f"Error processing {file_name}: {e}")
+        return embedded_files
 
     def store_nodes(
         self,
         input_files: list[str],
         embed_nodes: bool = True,
         embed_model: Any | None = None,
+        use_processes: bool = False,
     ) -> List[BaseNode]:
         return_nodes = []
         self._ingested_file = []
         if len(input_files) == 0:
             return return_nodes
-        splitter = SentenceSplitter.from_defaults(
-            chunk_size=self._setting.ingestion.chunk_size,
-            chunk_overlap=self._setting.ingestion.chunk_overlap,
-            paragraph_separator=self._setting.ingestion.paragraph_sep,
-            secondary_chunking_regex=self._setting.ingestion.chunking_regex,
-        )
         if embed_nodes:
             Settings.embed_model = embed_model or Settings.embed_model
         
         cached_count = 0
-        processed_count = 0
+        pending = []
+        file_keys = {}
         
-        for input_file in tqdm(input_files, desc="Loading documents"):
-            file_name = input_file.strip().split("/")[-1]
-            # Also handle Windows paths
-            if "\\" in file_name:
-                file_name = file_name.split("\\")[-1]
+        for input_file in input_files:
+            # Normalize Windows separators so basename handles both path styles on any OS
+            file_name = os.path.basename(input_file.strip().replace("\\", "/"))
             
             self._ingested_file.append(file_name)
             
             # First check in-memory store
             if file_name in self._node_store:
-                return_nodes.extend(self._node_store[file_name])
                 cached_count += 1
                 continue
             
-            # Then check persistent cache
-            cached_nodes = self._load_cached_nodes(file_name, input_file)
+            # Then check persistent cache; the hash is computed once and reused when saving
+            cached_nodes, file_hash, file_stat = self._load_cached_nodes(file_name, input_file)
             if cached_nodes is not None:
                 self._node_store[file_name] = cached_nodes
-                return_nodes.extend(cached_nodes)
                 cached_count += 1
                 continue
             
-            # Process the file if not cached
-            processed_count += 1
-            try:
-                # Check file type
-                ext = Path(input_file).suffix.lower()
-                
-                if ext == '.pdf':
-                    # Read PDF with page information
-                    pages_data = self._read_pdf(input_file)
-                    
-                    if not pages_data:
-                        print(f"No content extracted from {file_name}")
-                        continue
-                    
-                    # Process each page separately to maintain page boundaries
-                    nodes = []
-                    for page_num, page_text in pages_data:
-                        if page_text.strip():  # Only add pages with content
-                            doc = Document(
-                                text=page_text,
-                                metadata={
-                                    "file_name": file_name,
-                                    "page_label": str(page_num),
-                                },
-                            )
-                            # Split this page into chunks
-                            page_nodes = splitter([doc], show_progress=False)
-                            # Ensure all chunks from this page have the correct page_label
-                            for node in page_nodes:
-                                node.metadata["page_label"] = str(page_num)
-                            nodes.extend(page_nodes)
-                else:
-                    # Read other file types (returns string)
-                    all_text = self._read_file(input_file)
-                    
-                    document = Document(
-                        text=all_text,
-                        metadata={
-                            "file_name": file_name,
-                        },
-                    )
-                    nodes = splitter([document], show_progress=False)
-                
-                # Embed nodes if needed
-                if embed_nodes and nodes:
-                    nodes = Settings.embed_model(nodes, show_progress=False)
-                
-                # Store in memory and persist to cache
+            pending.append((input_file, file_name))
+            file_keys[file_name] = (file_hash, file_stat)
+        
+        # Reading, filtering and splitting are independent per file; embedding stays
+        # in this process, where the embedding model lives. Worker processes are only used
+        # when the caller allows it (startup/CLI ingestion, never request threads)
+        if pending:
+            results = self._read_and_split_all(pending, self._get_splitter(), use_processes)
+            split_files = [
+                (input_file, file_name, nodes)
+                for (input_file, file_name), nodes in zip(pending, results)
+                if nodes is not None
+            ]
+            if embed_nodes:
+                split_files = self._embed_files(split_files)
+            
+            # Store in memory and persist to cache
+            for input_file, file_name, nodes in split_files:
                 self._node_store[file_name] = nodes
-                self._save_cached_nodes(file_name, input_file, nodes)
-                return_nodes.extend(nodes)
-                
-            except Exception as e:
-                print(f"Error processing {file_name}: {e}")
-                continue
+                self._save_cached_nodes(file_name, *file_keys[file_name], nodes)
+        
+        # Keep the input order of files in the returned nodes
+        for file_name in self._ingested_file:
+            return_nodes.extend(self._node_store.get(file_name, []))
         
+        processed_count = len(pending)
         if cached_count > 0 or processed_count > 0:
             print(f"[CACHE] Summary: {cached_count} documents from cache, {processed_count} newly processed")
         
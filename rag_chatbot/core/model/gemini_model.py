@@ -2,11 +2,42 @@
 Gemini API adapter for RAG system
 Provides a bridge between llama-index and Google's Gemini API
 """
+import asyncio
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+import requests
 from google import genai
-from llama_index.core.llms import CustomLLM, CompletionResponse, CompletionResponseGen, LLMMetadata
+from google.genai import errors as genai_errors
+from llama_index.core.llms import (
+    CustomLLM,
+    CompletionResponse,
+    CompletionResponseAsyncGen,
+    CompletionResponseGen,
+    LLMMetadata,
+)
 from llama_index.core.llms.callbacks import llm_completion_callback
 from typing import Any, Optional
 
+# google-genai has no request timeout, so blocking calls run on this pool and are
+# abandoned (not killed) once GeminiLLM.timeout passes
+_request_pool = ThreadPoolExecutor(max_workers=8, thread_name_prefix="gemini")
+
+
+def _is_retryable(error: Exception) -> bool:
+    """Timeouts, dropped connections, rate limits and 5xx responses are worth retrying"""
+    if isinstance(error, genai_errors.APIError):
+        return error.code == 429 or (error.code or 0) >= 500
+    return isinstance(error, (
+        TimeoutError,
+        FutureTimeoutError,
+        asyncio.TimeoutError,
+        requests.ConnectionError,
+        requests.Timeout,
+    ))
+
 
 class GeminiLLM(CustomLLM):
     """Gemini API wrapper for llama-index"""
@@ -15,6 +46,11 @@ class GeminiLLM(CustomLLM):
     api_key: str = ""
     temperature: float = 0.1
     max_tokens: int = 2000
+    # Seconds to wait for a response (or, when streaming, for each chunk)
+    timeout: float = 30.0
+    # Extra attempts after a transient failure, with exponential backoff from retry_backoff seconds
+    max_retries: int = 3
+    retry_backoff: float = 0.5
     
     class Config:
         arbitrary_types_allowed = True
@@ -23,6 +59,10 @@ class GeminiLLM(CustomLLM):
         super().__init__(api_key=api_key, model=model, **kwargs)
         # Initialize client after calling super().__init__
         object.__setattr__(self, '_client', genai.Client(api_key=api_key))
+        # LRU cache of complete/chat responses: sha256(model + prompt) -> text
+        object.__setattr__(self, '_response_cache', OrderedDict())
+        object.__setattr__(self, '_response_cache_lock', threading.Lock())
+        object.__setattr__(self, '_response_cache_size', 1024)
     
     @property
     def client(self):
@@ -41,14 +81,84 @@ class GeminiLLM(CustomLLM):
             is_chat_model=True,
         )
     
+    def _cache_key(self, prompt: str) -> str:
+        return hashlib.sha256(f"{self.model}\x00{prompt}".encode("utf-8")).hexdigest()
+    
+    def _get_cached_response(self, key: str) -> Optional[str]:
+        with self._response_cache_lock:
+            text = self._response_cache.get(key)
+            if text is not None:
+                self._response_cache.move_to_end(key)
+            return text
+    
+    def _cache_response(self, key: str, text: Optional[str]) -> None:
+        if text is None:
+            return
+        with self._response_cache_lock:
+            self._response_cache[key] = text
+            self._response_cache.move_to_end(key)
+            if len(self._response_cache) > self._response_cache_size:
+                self._response_cache.popitem(last=False)
+    
+    def _generate(self, prompt: str):
+        """generate_content with a timeout and bounded retries on transient errors"""
+        for attempt in range(self.max_retries + 1):
+            future = _request_pool.submit(
+                self.client.models.generate_content,
+                model=self.model,
+                contents=prompt,
+            )
+            try:
+                return future.result(timeout=self.timeout)
+            except Exception as e:
+                future.cancel()
+                if attempt == self.max_retries or not _is_retryable(e):
+                    raise
+                print(f"Gemini API error (attempt {attempt + 1}), retrying: {e}")
+                time.sleep(self.retry_backoff * 2 ** attempt)
+    
+    async def _agenerate(self, prompt: str):
+        """Async generate_content with a timeout and bounded retries on transient errors"""
+        for attempt in range(self.max_retries + 1):
+            try:
+                return await asyncio.wait_for(
+                    self.client.aio.models.generate_content(
+                        model=self.model,
+                        contents=prompt,
+                    ),
+                    timeout=self.timeout,
+                )
+            except Exception as e:
+                if attempt == self.max_retries or not _is_retryable(e):
+                    raise
+                print(f"Gemini API error (attempt {attempt + 1}), retrying: {e}")
+                await asyncio.sleep(self.retry_backoff * 2 ** attempt)
+    
     @llm_completion_callback()
     def complete(self, prompt: str, **kwargs: Any) -> CompletionResponse:
         """Completion endpoint for Gemini."""
+        key = self._cache_key(prompt)
+        cached = self._get_cached_response(key)
+        if cached is not None:
+            return CompletionResponse(text=cached)
         try:
-            response = self.client.models.generate_content(
-                model=self.model,
-                contents=prompt,
-            )
+            response = self._generate(prompt)
+            self._cache_response(key, response.text)
+            return CompletionResponse(text=response.text)
+        except Exception as e:
+            print(f"Gemini API error: {e}")
+            return CompletionResponse(text=f"Error: {str(e)}")
+    
+    @llm_completion_callback()
+    async def acomplete(self, prompt: str, **kwargs: Any) -> CompletionResponse:
+        """Async completion endpoint for Gemini."""
+        key = self._cache_key(prompt)
+        cached = self._get_cached_response(key)
+        if cached is not None:
+            return CompletionResponse(text=cached)
+        try:
+            response = await self._agenerate(prompt)
+            self._cache_response(key, response.text)
             return CompletionResponse(text=response.text)
         except Exception as e:
             print(f"Gemini API error: {e}")
@@ -64,11 +174,14 @@ class GeminiLLM(CustomLLM):
             )
             
             def gen():
-                text = ""
+                # Yield deltas only; the full text is joined once, in a final response
+                parts = []
                 for chunk in response:
                     if chunk.text:
-                        text += chunk.text
-                        yield CompletionResponse(text=text, delta=chunk.text)
+                        parts.append(chunk.text)
+                        yield CompletionResponse(text=chunk.text, delta=chunk.text)
+                if parts:
+                    yield CompletionResponse(text="".join(parts), delta="")
             
             return gen()
         except Exception as e:
@@ -77,6 +190,33 @@ class GeminiLLM(CustomLLM):
                 yield CompletionResponse(text=f"Error: {str(e)}")
             return error_gen()
     
+    @llm_completion_callback()
+    async def astream_complete(self, prompt: str, **kwargs: Any) -> CompletionResponseAsyncGen:
+        """Async streaming completion endpoint for Gemini."""
+        async def gen():
+            parts = []
+            try:
+                stream = self.client.aio.models.generate_content_stream(
+                    model=self.model,
+                    contents=prompt,
+                )
+                while True:
+                    # Bound the wait for each chunk, so a stalled stream cannot hang the caller
+                    try:
+                        chunk = await asyncio.wait_for(anext(stream), timeout=self.timeout)
+                    except StopAsyncIteration:
+                        break
+                    if chunk.text:
+                        parts.append(chunk.text)
+                        yield CompletionResponse(text=chunk.text, delta=chunk.text)
+                if parts:
+                    yield CompletionResponse(text="".join(parts), delta="")
+            except Exception as e:
+                print(f"Gemini API streaming error: {e}")
+                yield CompletionResponse(text=f"Error: {str(e)}")
+        
+        return gen()
+    
     def chat(self, messages, **kwargs):
         """Chat endpoint for Gemini."""
         from llama_index.core.base.llms.types import ChatResponse, ChatMessage as LLMChatMessage
@@ -94,11 +234,16 @@ class GeminiLLM(CustomLLM):
         
         prompt = "\n".join(prompt_parts)
         
-        try:
-            response = self.client.models.generate_content(
-                model=self.model,
-                contents=prompt,
+        key = self._cache_key(prompt)
+        cached = self._get_cached_response(key)
+        if cached is not None:
+            return ChatResponse(
+                message=LLMChatMessage(role="assistant", content=cached),
+                raw=None
             )
+        try:
+            response = self._generate(prompt)
+            self._cache_response(key, response.text)
             return ChatResponse(
                 message=LLMChatMessage(role="assistant", content=response.text),
                 raw=response
@@ -134,15 +279,22 @@ class GeminiLLM(CustomLLM):
             )
             
             def gen():
-                text = ""
+                # Yield deltas only; the full text is joined once, in a final response
+                parts = []
                 for chunk in response:
                     if chunk.text:
-                        text += chunk.text
+                        parts.append(chunk.text)
                         yield ChatResponse(
-                            message=LLMChatMessage(role="assistant", content=text),
+                            message=LLMChatMessage(role="assistant", content=chunk.text),
                             delta=chunk.text,
                             raw=chunk
                         )
+                if parts:
+                    yield ChatResponse(
+                        message=LLMChatMessage(role="assistant", content="".join(parts)),
+                        delta="",
+                        raw=None
+                    )
             
             return gen()
         except Exception as e:
@@ -1,17 +1,129 @@
-from llama_index.llms.ollama import Ollama
-from llama_index.llms.openai import OpenAI
-from llama_index.core.llms import CustomLLM, CompletionResponse, CompletionResponseGen, LLMMetadata
+from llama_index.core.llms import (
+    CustomLLM,
+    CompletionResponse,
+    CompletionResponseAsyncGen,
+    CompletionResponseGen,
+    LLMMetadata,
+)
 from llama_index.core.llms.callbacks import llm_completion_callback
-from ...setting import RAGSettings
+from ...setting import RAGSettings, get_settings
 from dotenv import load_dotenv
-import requests
+import asyncio
+import functools
 import os
-from typing import Any, Optional
-from openai import OpenAI as OpenAIClient
+import threading
+import time
+import weakref
+from typing import TYPE_CHECKING, Any, Optional
+import httpx
+import orjson
+from .response_cache import ResponseCache, get_response_cache
+
+# Provider SDKs are imported where they are used, so startup only pays for the one in use
+if TYPE_CHECKING:
+    from openai import AsyncOpenAI, OpenAI as OpenAIClient
 
 load_dotenv()
 
 
+# Model names routed to the standard OpenAI API
+_OPENAI_MODELS = frozenset({"gpt-3.5-turbo", "gpt-4", "gpt-4o", "gpt-4-turbo"})
+
+# One keep-alive connection pool for all sync HTTP in this module: Ollama admin calls and the
+# OpenRouter SDK clients. Timeouts mirror the openai SDK defaults (long reads for generations)
+_http_client = httpx.Client(
+    limits=httpx.Limits(
+        max_keepalive_connections=20,
+        max_connections=100,
+        keepalive_expiry=30.0,
+    ),
+    timeout=httpx.Timeout(600.0, connect=5.0),
+    follow_redirects=True,
+)
+
+# Ollama /api/tags results: base_url -> (fetched_at, model names); a short TTL collapses bulk checks
+_ollama_tags_cache = {}
+_ollama_tags_lock = threading.Lock()
+_OLLAMA_TAGS_TTL = 5.0
+
+
+def _fetch_ollama_tags(base_url: str) -> frozenset:
+    """Get the names of the models available on an Ollama server, cached for a few seconds"""
+    now = time.monotonic()
+    with _ollama_tags_lock:
+        cached = _ollama_tags_cache.get(base_url)
+        if cached is not None and now - cached[0] < _OLLAMA_TAGS_TTL:
+            return cached[1]
+    data = orjson.loads(_http_client.get(f"{base_url}/api/tags").content)
+    names = frozenset(d["name"] for d in data["models"] or [])
+    with _ollama_tags_lock:
+        _ollama_tags_cache[base_url] = (now, names)
+    return names
+
+
+# Transient failures (429, 5xx, connection errors, timeouts) are retried by the openai SDK itself,
+# with exponential backoff starting at 0.5s; this is the number of retries after the first attempt
+_OPENROUTER_MAX_RETRIES = 3
+
+# Attribution headers sent with every OpenRouter request; the SDK only reads them
+_OPENROUTER_HEADERS = {
+    "HTTP-Referer": "http://localhost:7860",
+    "X-Title": "Internal Knowledge System",
+}
+
+# OpenAI-compatible clients keyed by (api_key, base_url), reused so HTTP connections stay alive
+_openrouter_clients = {}
+_openrouter_clients_lock = threading.Lock()
+
+
+def _get_openrouter_client(api_key: str, base_url: str) -> "OpenAIClient":
+    """Get the shared OpenAI client for an API key and base URL"""
+    from openai import OpenAI as OpenAIClient
+    
+    key = (api_key, base_url)
+    with _openrouter_clients_lock:
+        client = _openrouter_clients.get(key)
+        if client is None:
+            client = OpenAIClient(
+                api_key=api_key,
+                base_url=base_url,
+                max_retries=_OPENROUTER_MAX_RETRIES,
+                http_client=_http_client,
+            )
+            _openrouter_clients[key] = client
+        return client
+
+
+# Async clients per event loop: httpx connections cannot be shared across loops
+_openrouter_async_clients = weakref.WeakKeyDictionary()
+
+
+def _get_openrouter_async_client(api_key: str, base_url: str) -> "AsyncOpenAI":
+    """Get the shared AsyncOpenAI client for an API key and base URL on the running event loop"""
+    from openai import AsyncOpenAI, DefaultAsyncHttpxClient
+    
+    loop = asyncio.get_running_loop()
+    key = (api_key, base_url)
+    with _openrouter_clients_lock:
+        clients = _openrouter_async_clients.setdefault(loop, {})
+        client = clients.get(key)
+        if client is None:
+            client = AsyncOpenAI(
+                api_key=api_key,
+                base_url=base_url,
+                max_retries=_OPENROUTER_MAX_RETRIES,
+                http_client=DefaultAsyncHttpxClient(
+                    limits=httpx.Limits(
+                        max_keepalive_connections=20,
+                        max_connections=100,
+                        keepalive_expiry=30.0,
+                    )
+                ),
+            )
+            clients[key] = client
+        return client
+
+
 class OpenRouterLLM(CustomLLM):
     """Custom LLM for OpenRouter API"""
     
@@ -21,6 +133,8 @@ class OpenRouterLLM(CustomLLM):
     temperature: float = 0.1
     max_tokens: int = 2000
     context_window: int = 8000
+    # Serve repeated prompts from the persistent response cache; disable for high-temperature use
+    cache_responses: bool = True
     
     @property
     def metadata(self) -> LLMMetadata:
@@ -30,54 +144,240 @@ class OpenRouterLLM(CustomLLM):
             model_name=self.model,
         )
     
+    @property
+    def client(self) -> "OpenAIClient":
+        """Get the pooled OpenRouter client"""
+        return _get_openrouter_client(self.api_key, self.base_url)
+    
+    @property
+    def async_client(self) -> "AsyncOpenAI":
+        """Get the pooled async OpenRouter client for the running event loop"""
+        return _get_openrouter_async_client(self.api_key, self.base_url)
+    
     @llm_completion_callback()
     def complete(self, prompt: str, **kwargs: Any) -> CompletionResponse:
-        client = OpenAIClient(
-            api_key=self.api_key,
-            base_url=self.base_url,
-        )
+        cache = get_response_cache() if self.cache_responses else None
+        if cache is not None:
+            cache_key = ResponseCache.make_key(self.model, self.temperature, self.max_tokens, prompt)
+            cached = cache.get(cache_key)
+            if cached is not None:
+                return CompletionResponse(text=cached)
         
-        response = client.chat.completions.create(
+        response = self.client.chat.completions.create(
             model=self.model,
             messages=[{"role": "user", "content": prompt}],
             temperature=self.temperature,
             max_tokens=self.max_tokens,
-            extra_headers={
-                "HTTP-Referer": "http://localhost:7860",
-                "X-Title": "Internal Knowledge System"
-            }
+            extra_headers=_OPENROUTER_HEADERS,
         )
         
-        return CompletionResponse(text=response.choices[0].message.content)
+        text = response.choices[0].message.content
+        if cache is not None and text is not None:
+            cache.set(cache_key, text)
+        return CompletionResponse(text=text)
     
     @llm_completion_callback()
     def stream_complete(self, prompt: str, **kwargs: Any) -> CompletionResponseGen:
-        client = OpenAIClient(
-            api_key=self.api_key,
-            base_url=self.base_url,
-        )
-        
-        response = client.chat.completions.create(
+        response = self.client.chat.completions.create(
             model=self.model,
             messages=[{"role": "user", "content": prompt}],
             temperature=self.temperature,
             max_tokens=self.max_tokens,
             stream=True,
-            extra_headers={
-                "HTTP-Referer": "http://localhost:7860",
-                "X-Title": "Internal Knowledge System"
-            }
+            extra_headers=_OPENROUTER_HEADERS,
         )
         
         def gen():
-            text = ""
+            # Yield deltas only; the full text is joined once, in a final response.
+            # Consumers should collect the deltas in a list and join once as well
+            parts = []
             for chunk in response:
-                if chunk.choices[0].delta.content:
+                if chunk.choices and chunk.choices[0].delta.content:
+                    delta = chunk.choices[0].delta.content
+                    parts.append(delta)
+                    yield CompletionResponse(text=delta, delta=delta)
+            if parts:
+                yield CompletionResponse(text="".join(parts), delta="")
+        
+        return gen()
+    
+    @llm_completion_callback()
+    async def acomplete(self, prompt: str, **kwargs: Any) -> CompletionResponse:
+        cache = get_response_cache() if self.cache_responses else None
+        if cache is not None:
+            cache_key = ResponseCache.make_key(self.model, self.temperature, self.max_tokens, prompt)
+            cached = cache.get(cache_key)
+            if cached is not None:
+                return CompletionResponse(text=cached)
+        
+        response = await self.async_client.chat.completions.create(
+            model=self.model,
+            messages=[{"role": "user", "content": prompt}],
+            temperature=self.temperature,
+            max_tokens=self.max_tokens,
+            extra_headers=_OPENROUTER_HEADERS,
+        )
+        
+        text = response.choices[0].message.content
+        if cache is not None and text is not None:
+            cache.set(cache_key, text)
+        return CompletionResponse(text=text)
+    
+    @llm_completion_callback()
+    async def astream_complete(self, prompt: str, **kwargs: Any) -> CompletionResponseAsyncGen:
+        response = await self.async_client.chat.completions.create(
+            model=self.model,
+            messages=[{"role": "user", "content": prompt}],
+            temperature=self.temperature,
+            max_tokens=self.max_tokens,
+            stream=True,
+            extra_headers=_OPENROUTER_HEADERS,
+        )
+        
+        async def gen():
+            # Yield deltas only; the full text is joined once, in a final response.
+            # Consumers should collect the deltas in a list and join once as well
+            parts = []
+            async for chunk in response:
+                if chunk.choices and chunk.choices[0].delta.content:
                     delta = chunk.choices[0].delta.content
-                    text += delta
-                    yield CompletionResponse(text=text, delta=delta)
+                    parts.append(delta)
+                    yield CompletionResponse(text=delta, delta=delta)
+            if parts:
+                yield CompletionResponse(text="".join(parts), delta="")
         
         return gen()
+    
+    async def complete_batch(
+        self,
+        prompts: list[str],
+        concurrency: int = 20,
+        output_jsonl: Optional[str] = None,
+    ) -> list[CompletionResponse]:
+        """
+        Complete many prompts concurrently, at most `concurrency` requests in flight.
+        
+        Args:
+            prompts: Prompts to complete
+            concurrency: Maximum number of simultaneous API calls
+            output_jsonl: Optional checkpoint file; finished results are appended as they
+                complete, and results already in the file are reused on a rerun
+        
+        Returns:
+            Completion responses in the same order as prompts
+        """
+        # Key checkpointed results like the response cache, so a different model or sampling
+        # setting does not reuse answers from an earlier run
+        prompt_keys = [
+            ResponseCache.make_key(self.model, self.temperature, self.max_tokens, prompt)
+            for prompt in prompts
+        ]
+        results: list[Optional[CompletionResponse]] = [None] * len(prompts)
+        
+        if output_jsonl and os.path.exists(output_jsonl):
+            with open(output_jsonl, 'rb') as f:
+                for line in f:
+                    if not line.strip():
+                        continue
+                    record = orjson.loads(line)
+                    index = record.get("index")
+                    if isinstance(index, int) and 0 <= index < len(prompts) and record.get("key") == prompt_keys[index]:
+                        results[index] = CompletionResponse(text=record["text"])
+        
+        semaphore = asyncio.Semaphore(concurrency)
+        checkpoint = open(output_jsonl, 'ab') if output_jsonl else None
+        
+        async def run(index: int) -> None:
+            async with semaphore:
+                response = await self.acomplete(prompts[index])
+            results[index] = response
+            if checkpoint is not None:
+                checkpoint.write(orjson.dumps(
+                    {"index": index, "key": prompt_keys[index], "text": response.text},
+                    option=orjson.OPT_APPEND_NEWLINE,
+                ))
+                checkpoint.flush()
+        
+        # Let every request settle before the checkpoint closes, so one failed prompt does not
+        # stop the others' results from being written; the first failure is raised afterwards
+        try:
+            outcomes = await asyncio.gather(
+                *(run(i) for i, result in enumerate(results) if result is None),
+                return_exceptions=True,
+            )
+        finally:
+            if checkpoint is not None:
+                checkpoint.close()
+        for outcome in outcomes:
+            if isinstance(outcome, BaseException):
+                raise outcome
+        return results
+
+
+@functools.lru_cache(maxsize=64)
+def _classify_model(model_name: str) -> str:
+    """Return the backend serving a model: "openrouter", "openai" or "ollama"
+
+    OpenRouter: "qwen/qwen3-4b:free" or "anthropic/claude-3" (provider/model)
+    Ollama: "qwen2:latest" or "llama3:8b" (no slash)
+    GPT: "gpt-4" (no slash)
+    """
+    if "/" in model_name:
+        return "openrouter"
+    if model_name in _OPENAI_MODELS:
+        return "openai"
+    return "ollama"
+
+
+def _build_openrouter_llm(model_name: str, system_prompt: str | None, host: str, setting: RAGSettings):
+    api_key = LocalRAGModel._read_api_key(setting.openrouter.api_key_file)
+    return OpenRouterLLM(
+        model=model_name,
+        api_key=api_key,
+        base_url=setting.openrouter.base_url,
+        temperature=setting.openrouter.temperature,
+        max_tokens=setting.openrouter.max_tokens,
+        context_window=setting.openrouter.context_window,
+    )
+
+
+def _build_openai_llm(model_name: str, system_prompt: str | None, host: str, setting: RAGSettings):
+    from llama_index.llms.openai import OpenAI
+    
+    return OpenAI(model=model_name, temperature=setting.ollama.temperature)
+
+
+def _build_ollama_llm(model_name: str, system_prompt: str | None, host: str, setting: RAGSettings):
+    # Including models like qwen2:latest, llama3:latest, etc.
+    from llama_index.llms.ollama import Ollama
+    
+    settings_kwargs = {
+        "tfs_z": setting.ollama.tfs_z,
+        "top_k": setting.ollama.top_k,
+        "top_p": setting.ollama.top_p,
+        "repeat_last_n": setting.ollama.repeat_last_n,
+        "repeat_penalty": setting.ollama.repeat_penalty,
+    }
+    return Ollama(
+        model=model_name,
+        system_prompt=system_prompt,
+        base_url=f"http://{host}:{setting.ollama.port}",
+        temperature=setting.ollama.temperature,
+        context_window=setting.ollama.context_window,
+        request_timeout=setting.ollama.request_timeout,
+        additional_kwargs=settings_kwargs,
+    )
+
+
+_LLM_BUILDERS = {
+    "openrouter": _build_openrouter_llm,
+    "openai": _build_openai_llm,
+    "ollama": _build_ollama_llm,
+}
+
+# LLMs built by LocalRAGModel.set in this process, reused for identical configurations
+_llms = {}
+_llms_lock = threading.Lock()
 
 
 class LocalRAGModel:
@@ -86,13 +386,20 @@ class LocalRAGModel:
 
     @staticmethod
     def _read_api_key(api_key_file: str) -> str:
-        """Read API key from file"""
+        """Read API key from file; cached until the file's mtime changes"""
         try:
-            with open(api_key_file, 'r') as f:
-                return f.read().strip()
+            mtime_ns = os.stat(api_key_file).st_mtime_ns
+            return LocalRAGModel._read_api_key_cached(api_key_file, mtime_ns)
         except FileNotFoundError:
             raise ValueError(f"API key file not found: {api_key_file}")
 
+    @staticmethod
+    @functools.lru_cache(maxsize=8)
+    def _read_api_key_cached(api_key_file: str, mtime_ns: int) -> str:
+        # mtime_ns is part of the cache key so a rotated key file is re-read
+        with open(api_key_file, 'r') as f:
+            return f.read().strip()
+
     @staticmethod
     def set(
         model_name: str = "qwen/qwen3-4b:free",
@@ -100,60 +407,42 @@ class LocalRAGModel:
         host: str = "localhost",
         setting: RAGSettings | None = None,
     ):
-        setting = setting or RAGSettings()
-        
-        # Check if it's an OpenRouter model (contains "/" in format "provider/model")
-        # OpenRouter: "qwen/qwen3-4b:free" or "anthropic/claude-3"
-        # Ollama: "qwen2:latest" or "llama3:8b" (no slash)
-        # GPT: "gpt-4" (no slash)
-        if "/" in model_name:
-            # Use custom OpenRouter LLM
-            api_key = LocalRAGModel._read_api_key(setting.openrouter.api_key_file)
-            return OpenRouterLLM(
-                model=model_name,
-                api_key=api_key,
-                base_url=setting.openrouter.base_url,
-                temperature=setting.openrouter.temperature,
-                max_tokens=setting.openrouter.max_tokens,
-                context_window=setting.openrouter.context_window,
-            )
-        elif model_name in ["gpt-3.5-turbo", "gpt-4", "gpt-4o", "gpt-4-turbo"]:
-            # Use standard OpenAI
-            return OpenAI(model=model_name, temperature=setting.ollama.temperature)
+        setting = setting or get_settings()
+        kind = _classify_model(model_name)
+        # Key on the settings section the builder reads, so a changed config gets a new LLM
+        if kind == "openrouter":
+            config = (repr(setting.openrouter), LocalRAGModel._read_api_key(setting.openrouter.api_key_file))
         else:
-            # Use Ollama (including models like qwen2:latest, llama3:latest, etc.)
-            settings_kwargs = {
-                "tfs_z": setting.ollama.tfs_z,
-                "top_k": setting.ollama.top_k,
-                "top_p": setting.ollama.top_p,
-                "repeat_last_n": setting.ollama.repeat_last_n,
-                "repeat_penalty": setting.ollama.repeat_penalty,
-            }
-            return Ollama(
-                model=model_name,
-                system_prompt=system_prompt,
-                base_url=f"http://{host}:{setting.ollama.port}",
-                temperature=setting.ollama.temperature,
-                context_window=setting.ollama.context_window,
-                request_timeout=setting.ollama.request_timeout,
-                additional_kwargs=settings_kwargs,
-            )
+            config = (repr(setting.ollama),)
+        key = (kind, model_name, system_prompt, host, config)
+        with _llms_lock:
+            if key not in _llms:
+                _llms[key] = _LLM_BUILDERS[kind](model_name, system_prompt, host, setting)
+            return _llms[key]
 
     @staticmethod
     def pull(host: str, model_name: str):
-        setting = RAGSettings()
+        setting = get_settings()
         payload = {"name": model_name}
-        return requests.post(
-            f"http://{host}:{setting.ollama.port}/api/pull", json=payload, stream=True
-        )
+        base_url = f"http://{host}:{setting.ollama.port}"
+        # The model list is about to change
+        with _ollama_tags_lock:
+            _ollama_tags_cache.pop(base_url, None)
+        request = _http_client.build_request("POST", f"{base_url}/api/pull", json=payload)
+        return _http_client.send(request, stream=True)
+
+    @staticmethod
+    def iter_pull_progress(host: str, model_name: str):
+        """Pull a model and yield Ollama's progress updates as dicts until the pull finishes"""
+        response = LocalRAGModel.pull(host, model_name)
+        try:
+            for line in response.iter_lines():
+                if line:
+                    yield orjson.loads(line)
+        finally:
+            response.close()
 
     @staticmethod
     def check_model_exist(host: str, model_name: str) -> bool:
-        setting = RAGSettings()
-        data = requests.get(f"http://{host}:{setting.ollama.port}/api/tags").json()
-        if data["models"] is None:
-            return False
-        list_model = [d["name"] for d in data["models"]]
-        if model_name in list_model:
-            return True
-        return False
+        setting = get_settings()
+        return model_name in _fetch_ollama_tags(f"http://{host}:{setting.ollama.port}")
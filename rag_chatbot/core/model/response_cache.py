@@ -0,0 +1,80 @@
+"""
+LLM response cache
+Exact-match cache of completion texts in SQLite, shared across processes and restarts
+"""
+import hashlib
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Optional
+
+
+class ResponseCache:
+    """SQLite-backed cache of LLM responses with a TTL"""
+
+    def __init__(self, db_path: str = "data/cache/llm_responses.db", ttl: float = 3600.0):
+        self.db_path = str(Path(db_path).resolve())
+        self.ttl = ttl
+        self._local = threading.local()
+        Path(self.db_path).parent.mkdir(parents=True, exist_ok=True)
+        with self._conn() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS responses (
+                    key TEXT PRIMARY KEY,
+                    response TEXT NOT NULL,
+                    expires_at INTEGER NOT NULL
+                ) WITHOUT ROWID
+            """)
+            conn.execute("DELETE FROM responses WHERE expires_at < ?", (int(time.time()),))
+
+    def _conn(self) -> sqlite3.Connection:
+        """Return this thread's long-lived connection, opening it on first use"""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    @staticmethod
+    def make_key(*parts) -> str:
+        """Build a cache key from everything that affects the response (model, sampling params, prompt)"""
+        return hashlib.sha256("\x00".join(str(part) for part in parts).encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        """Return the cached response, or None on a miss or expired entry"""
+        try:
+            row = self._conn().execute(
+                "SELECT response FROM responses WHERE key = ? AND expires_at >= ?",
+                (key, int(time.time())),
+            ).fetchone()
+            return row[0] if row else None
+        except sqlite3.Error as e:
+            print(f"[LLM CACHE] Warning: Could not read response cache: {e}")
+            return None
+
+    def set(self, key: str, response: str) -> None:
+        """Store a response until the TTL expires"""
+        try:
+            with self._conn() as conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO responses (key, response, expires_at) VALUES (?, ?, ?)",
+                    (key, response, int(time.time() + self.ttl)),
+                )
+        except sqlite3.Error as e:
+            print(f"[LLM CACHE] Warning: Could not write response cache: {e}")
+
+
+_response_cache: Optional[ResponseCache] = None
+_response_cache_lock = threading.Lock()
+
+
+def get_response_cache() -> ResponseCache:
+    """Get the process-wide response cache, creating it on first use"""
+    global _response_cache
+    with _response_cache_lock:
+        if _response_cache is None:
+            _response_cache = ResponseCache()
+        return _response_cache
@@ -1,6 +1,6 @@
 from llama_index.core import VectorStoreIndex
 from dotenv import load_dotenv
-from ...setting import RAGSettings
+from ...setting import RAGSettings, get_settings
 
 load_dotenv()
 
@@ -13,7 +13,7 @@ class LocalVectorStore:
     ) -> None:
         # TODO
         # CHROMA VECTOR STORE
-        self._setting = setting or RAGSettings()
+        self._setting = setting or get_settings()
 
     def get_index(self, nodes):
         if len(nodes) == 0:
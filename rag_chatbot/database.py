@@ -1,12 +1,435 @@
 """
 Database models for the internal knowledge system
 """
+import atexit
+import functools
+import itertools
+import os
+import queue
+import re
 import sqlite3
-import json
+import threading
+import time
+from collections import Counter, OrderedDict
 from datetime import datetime
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Tuple
 from pathlib import Path
 
+import orjson
+
+# Hot-path statements, kept as constants so every call hits the connection's statement cache
+# (sqlite3's per-connection LRU, sized by cached_statements in Database._pooled)
+SQL_ADD_DOCUMENT = """
+    INSERT INTO documents
+    (filename, original_filename, file_type, file_size, uploaded_by, metadata)
+    VALUES (?, ?, ?, ?, ?, ?)
+"""
+SQL_CREATE_REPORT = """
+    INSERT INTO user_reports
+    (question, answer, report_type, report_reason, user_comment)
+    VALUES (?, ?, ?, ?, ?)
+"""
+SQL_RESOLVE_REPORT = """
+    UPDATE user_reports
+    SET status = 'resolved',
+        resolved_at = CURRENT_TIMESTAMP,
+        resolved_by = ?,
+        resolution_notes = ?
+    WHERE id = ?
+"""
+SQL_ADD_CHAT = """
+    INSERT INTO chat_history
+    (session_id, user_id, user_type, question, answer, sources)
+    VALUES (?, ?, ?, ?, ?, ?)
+"""
+SQL_ADD_ARTICLE = """
+    INSERT INTO technical_articles
+    (source_id, title, summary, content, url, published_date, role_type)
+    VALUES (?, ?, ?, ?, ?, ?, ?)
+"""
+SQL_UPSERT_ARTICLE = SQL_ADD_ARTICLE + "ON CONFLICT(url) DO NOTHING RETURNING id\n"
+SQL_MARK_ARTICLE_EMBEDDED = """
+    UPDATE technical_articles
+    SET is_embedded = 1
+    WHERE id = ?
+"""
+SQL_INCREMENT_VIEW_COUNT = """
+    UPDATE technical_articles
+    SET view_count = view_count + 1
+    WHERE id = ?
+"""
+SQL_GET_DOCUMENT = "SELECT * FROM documents WHERE id = ?"
+SQL_GET_SESSION_HISTORY = """
+    SELECT * FROM chat_history
+    WHERE session_id = ?
+    ORDER BY id ASC
+"""
+SQL_GET_CHAT_COUNT = "SELECT value FROM stats WHERE name = 'chat_total'"
+SQL_GET_USER_CHAT_COUNT = "SELECT cnt FROM stats_user WHERE user_id = ?"
+
+# Schema version stored in PRAGMA user_version; bump it when adding a migration
+SCHEMA_VERSION = 4
+
+DDL_SCRIPT = """
+-- Documents table
+CREATE TABLE IF NOT EXISTS documents (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    filename TEXT NOT NULL,
+    original_filename TEXT NOT NULL,
+    file_type TEXT NOT NULL,
+    file_size INTEGER,
+    upload_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    uploaded_by TEXT DEFAULT 'admin',
+    status TEXT DEFAULT 'active',
+    metadata TEXT
+);
+
+-- User reports table
+CREATE TABLE IF NOT EXISTS user_reports (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    question TEXT NOT NULL,
+    answer TEXT,
+    report_type TEXT NOT NULL,
+    report_reason TEXT,
+    user_comment TEXT,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    status TEXT DEFAULT 'pending',
+    resolved_at TIMESTAMP,
+    resolved_by TEXT,
+    resolution_notes TEXT
+);
+
+-- Chat history table
+CREATE TABLE IF NOT EXISTS chat_history (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    session_id TEXT NOT NULL,
+    user_id INTEGER,
+    user_type TEXT DEFAULT 'user',
+    question TEXT NOT NULL,
+    answer TEXT NOT NULL,
+    sources TEXT,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    FOREIGN KEY (user_id) REFERENCES users (id)
+);
+
+-- User roles and preferences table
+CREATE TABLE IF NOT EXISTS user_roles (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    user_id INTEGER UNIQUE NOT NULL,
+    role_type TEXT NOT NULL,
+    department TEXT,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    FOREIGN KEY (user_id) REFERENCES users (id)
+);
+
+-- Technical news sources table
+CREATE TABLE IF NOT EXISTS news_sources (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    source_name TEXT NOT NULL,
+    source_url TEXT NOT NULL,
+    source_type TEXT NOT NULL,
+    role_type TEXT NOT NULL,
+    update_frequency TEXT DEFAULT 'daily',
+    is_active INTEGER DEFAULT 1,
+    last_fetched TIMESTAMP,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+-- Technical articles/news table
+CREATE TABLE IF NOT EXISTS technical_articles (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    source_id INTEGER,
+    title TEXT NOT NULL,
+    summary TEXT,
+    content TEXT,
+    url TEXT NOT NULL,
+    published_date TIMESTAMP,
+    role_type TEXT,
+    is_embedded INTEGER DEFAULT 0,
+    view_count INTEGER DEFAULT 0,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    FOREIGN KEY (source_id) REFERENCES news_sources (id)
+);
+
+-- User-uploaded documents (pending approval)
+CREATE TABLE IF NOT EXISTS user_documents (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    filename TEXT NOT NULL,
+    original_filename TEXT NOT NULL,
+    file_type TEXT NOT NULL,
+    file_size INTEGER,
+    uploaded_by INTEGER NOT NULL,
+    role_type TEXT,
+    description TEXT,
+    status TEXT DEFAULT 'pending',
+    approved_by INTEGER,
+    approved_at TIMESTAMP,
+    rejection_reason TEXT,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    FOREIGN KEY (uploaded_by) REFERENCES users (id),
+    FOREIGN KEY (approved_by) REFERENCES users (id)
+);
+"""
+
+# Chat counters kept by triggers, so counts are point lookups instead of COUNT(*) scans;
+# the backfill seeds them from the rows stored before the triggers existed
+CHAT_COUNTERS_SCRIPT = """
+CREATE TABLE IF NOT EXISTS stats (
+    name TEXT PRIMARY KEY,
+    value INTEGER NOT NULL DEFAULT 0
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS stats_user (
+    user_id INTEGER PRIMARY KEY,
+    cnt INTEGER NOT NULL DEFAULT 0
+);
+
+CREATE TRIGGER IF NOT EXISTS chat_count_ins AFTER INSERT ON chat_history BEGIN
+    INSERT INTO stats (name, value) VALUES ('chat_total', 1)
+        ON CONFLICT(name) DO UPDATE SET value = value + 1;
+    INSERT INTO stats_user (user_id, cnt) SELECT new.user_id, 1 WHERE new.user_id IS NOT NULL
+        ON CONFLICT(user_id) DO UPDATE SET cnt = cnt + 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS chat_count_del AFTER DELETE ON chat_history BEGIN
+    UPDATE stats SET value = value - 1 WHERE name = 'chat_total';
+    UPDATE stats_user SET cnt = cnt - 1 WHERE user_id = old.user_id;
+END;
+
+INSERT OR REPLACE INTO stats (name, value) SELECT 'chat_total', COUNT(*) FROM chat_history;
+DELETE FROM stats_user;
+INSERT INTO stats_user (user_id, cnt)
+    SELECT user_id, COUNT(*) FROM chat_history WHERE user_id IS NOT NULL GROUP BY user_id;
+"""
+
+# Listings order by id (insertion order) rather than the second-resolution TEXT timestamps,
+# so single-column indexes suffice: SQLite keeps index entries in rowid order per key
+DROP_TIMESTAMP_INDEXES_SCRIPT = """
+DROP INDEX IF EXISTS idx_documents_status;
+DROP INDEX IF EXISTS idx_reports_status;
+DROP INDEX IF EXISTS idx_reports_created;
+DROP INDEX IF EXISTS idx_chat_session;
+DROP INDEX IF EXISTS idx_chat_user;
+DROP INDEX IF EXISTS idx_user_docs_status;
+DROP INDEX IF EXISTS idx_user_docs_uploader;
+"""
+
+# Indexes for the lookups the managers run on every request
+# Listings filter on the leading column and ORDER BY id, which every index carries
+# as its implicit trailing rowid, so these searches return rows already sorted
+INDEX_SCRIPT = """
+CREATE INDEX IF NOT EXISTS idx_documents_by_status ON documents(status);
+CREATE INDEX IF NOT EXISTS idx_reports_by_status ON user_reports(status);
+CREATE INDEX IF NOT EXISTS idx_chat_by_session ON chat_history(session_id);
+CREATE INDEX IF NOT EXISTS idx_chat_by_user ON chat_history(user_id);
+CREATE INDEX IF NOT EXISTS idx_articles_role_date ON technical_articles(role_type, published_date DESC);
+CREATE INDEX IF NOT EXISTS idx_user_docs_by_status ON user_documents(status);
+CREATE INDEX IF NOT EXISTS idx_user_docs_role ON user_documents(role_type, status);
+CREATE INDEX IF NOT EXISTS idx_user_docs_by_uploader ON user_documents(uploaded_by);
+CREATE INDEX IF NOT EXISTS idx_sources_role ON news_sources(role_type, is_active);
+"""
+
+
+def _dump_json(value) -> Optional[str]:
+    """Encode metadata/sources as compact UTF-8 JSON text; empty values are stored as NULL"""
+    if not value:
+        return None
+    return orjson.dumps(value, option=orjson.OPT_NON_STR_KEYS).decode("utf-8")
+
+
+def _page(limit: Optional[int], offset: int) -> tuple:
+    """LIMIT/OFFSET clause and params for an optional page; no limit returns every row"""
+    if limit is None:
+        return "", ()
+    return " LIMIT ? OFFSET ?", (limit, offset)
+
+
+def _fetch_dicts(cursor: sqlite3.Cursor) -> List[Dict]:
+    """Read all rows as dicts, built straight from the row tuples"""
+    names = [column[0] for column in cursor.description]
+    return [dict(zip(names, row)) for row in cursor]
+
+
+def _fetch_dict(cursor: sqlite3.Cursor) -> Optional[Dict]:
+    """Read one row as a dict, or None"""
+    row = cursor.fetchone()
+    if row is None:
+        return None
+    return dict(zip([column[0] for column in cursor.description], row))
+
+
+class _ReadCache:
+    """Small LRU cache with a TTL for read-mostly lookups
+
+    Writers in this process invalidate their keys; the TTL bounds staleness from writes
+    made by other processes (the admin and user web apps share the database file).
+    Callers get copies, so mutating a result never touches the cached value.
+    """
+    
+    def __init__(self, ttl: float, maxsize: int = 1024):
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self._entries: "OrderedDict[object, Tuple[float, object]]" = OrderedDict()
+        self._lock = threading.Lock()
+    
+    @staticmethod
+    def _copy(value):
+        if isinstance(value, list):
+            return [dict(item) for item in value]
+        return dict(value)
+    
+    def get(self, key):
+        """Return a copy of the cached value, or None on a miss"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if time.monotonic() - entry[0] >= self.ttl:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return self._copy(entry[1])
+    
+    def set(self, key, value) -> None:
+        with self._lock:
+            self._entries[key] = (time.monotonic(), self._copy(value))
+            self._entries.move_to_end(key)
+            if len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+    
+    def invalidate(self, key) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+    
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+class _PooledConnection(sqlite3.Connection):
+    """Long-lived per-thread connection; close() hands it back instead of closing it"""
+    
+    def reset(self):
+        """Drop whatever the previous user left behind"""
+        if self.in_transaction:
+            self.rollback()
+        self.row_factory = None
+    
+    def close(self):
+        # Uncommitted changes are discarded, as with a real close
+        self.reset()
+
+
+class _WriteBuffer:
+    """Background writer for fire-and-forget statements
+
+    Callers enqueue (sql, params) and return at once; a daemon thread drains the queue in
+    batches (up to `batch_size` statements or `window` seconds) and commits each batch as
+    one transaction on its own connection. A batch that keeps failing is retried `retries`
+    times and then written statement by statement. put() returns False when the queue is
+    full so the caller can write synchronously instead.
+    """
+    
+    def __init__(
+        self,
+        db: "Database",
+        maxsize: int = 10000,
+        batch_size: int = 1000,
+        window: float = 0.005,
+        retries: int = 3,
+    ):
+        self.db = db
+        self.maxsize = maxsize
+        self.batch_size = batch_size
+        self.window = window
+        self.retries = retries
+        self._lock = threading.Lock()
+        self._queue: Optional[queue.Queue] = None
+        self._thread: Optional[threading.Thread] = None
+        self._pid = None
+    
+    def _ensure_started(self) -> queue.Queue:
+        with self._lock:
+            # Threads do not survive fork(); a child starts its own writer
+            if self._thread is None or self._pid != os.getpid():
+                if self._thread is None:
+                    atexit.register(self.flush)
+                self._queue = queue.Queue(maxsize=self.maxsize)
+                self._thread = threading.Thread(target=self._run, name="db-writer", daemon=True)
+                self._pid = os.getpid()
+                self._thread.start()
+            return self._queue
+    
+    def put(self, sql: str, params: tuple) -> bool:
+        """Queue a statement; False when the buffer is full"""
+        try:
+            self._ensure_started().put_nowait((sql, params))
+            return True
+        except queue.Full:
+            return False
+    
+    def flush(self) -> None:
+        """Block until every queued statement has been written"""
+        if self._thread is not None and self._pid == os.getpid() and self._thread.is_alive():
+            self._queue.join()
+    
+    def _run(self) -> None:
+        q = self._queue
+        while True:
+            batch = [q.get()]
+            deadline = time.monotonic() + self.window
+            while len(batch) < self.batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(q.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            try:
+                self._write(batch)
+            except Exception as e:
+                # Never let one batch take the writer thread down
+                print(f"Warning: background write of {len(batch)} statements failed: {e}")
+            finally:
+                for _ in batch:
+                    q.task_done()
+    
+    def _write(self, batch: List[Tuple[str, tuple]]) -> None:
+        """Write a batch, retrying transient failures, then falling back to one statement at a time"""
+        for attempt in range(self.retries):
+            try:
+                self._write_batch(batch)
+                return
+            except sqlite3.OperationalError as e:
+                # Busy/locked past the connection timeout: back off and retry the whole batch
+                print(f"Warning: background write of {len(batch)} statements failed (attempt {attempt + 1}): {e}")
+                time.sleep(0.1 * 2 ** attempt)
+            except sqlite3.Error as e:
+                # A bad statement fails the batch every time; retrying it whole would not help
+                print(f"Warning: background write of {len(batch)} statements failed: {e}")
+                break
+        
+        # Write each statement in its own transaction, as the synchronous path does,
+        # so only the statements that fail themselves are lost
+        for sql, params in batch:
+            try:
+                self._write_batch([(sql, params)])
+            except sqlite3.Error as e:
+                print(f"Warning: dropped background write after retries: {e}")
+    
+    def _write_batch(self, batch: List[Tuple[str, tuple]]) -> None:
+        conn = self.db.get_connection()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            # Runs of the same statement go through one executemany
+            for sql, group in itertools.groupby(batch, key=lambda item: item[0]):
+                conn.executemany(sql, [params for _, params in group])
+            conn.commit()
+        finally:
+            conn.close()
+
 
 class Database:
     """Database handler for the knowledge system"""
@@ -15,143 +438,142 @@ class Database:
         resolved_path = Path(db_path).resolve()
         self.db_path = str(resolved_path)
         resolved_path.parent.mkdir(parents=True, exist_ok=True)
+        self._local = threading.local()
+        self.write_buffer = _WriteBuffer(self)
         self.init_database()
     
+    @staticmethod
+    def _configure(conn: sqlite3.Connection) -> sqlite3.Connection:
+        """Apply the per-connection PRAGMAs"""
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA temp_store=MEMORY")
+        conn.execute("PRAGMA cache_size=-64000")
+        conn.execute("PRAGMA mmap_size=268435456")
+        # Truncate the WAL back to 64MB after checkpoints instead of keeping its high-water size
+        conn.execute("PRAGMA journal_size_limit=67108864")
+        return conn
+    
+    def _pooled(self, role: str) -> sqlite3.Connection:
+        """Get this thread's connection for a role ("conn" or "reader"), opening it on first use"""
+        conn = getattr(self._local, role, None)
+        # A connection inherited across fork() must not be used in the child
+        if conn is None or getattr(self._local, role + "_pid", None) != os.getpid():
+            conn = sqlite3.connect(
+                self.db_path,
+                check_same_thread=False,
+                factory=_PooledConnection,
+                cached_statements=512,
+            )
+            self._configure(conn)
+            if role == "reader":
+                conn.execute("PRAGMA query_only=1")
+            setattr(self._local, role, conn)
+            setattr(self._local, role + "_pid", os.getpid())
+        else:
+            conn.reset()
+        return conn
+    
     def get_connection(self):
-        """Get database connection"""
-        return sqlite3.connect(self.db_path)
+        """Get this thread's read-write database connection"""
+        return self._pooled("conn")
+    
+    def get_read_connection(self):
+        """Get this thread's read-only connection; with WAL it never waits on a writer"""
+        return self._pooled("reader")
     
     def init_database(self):
         """Initialize database tables"""
         conn = self.get_connection()
+        # WAL persists in the DB file, so it only needs to be set once
+        conn.execute("PRAGMA journal_mode=WAL")
         cursor = conn.cursor()
+        version = cursor.execute("PRAGMA user_version").fetchone()[0]
         
-        # Documents table
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS documents (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                filename TEXT NOT NULL,
-                original_filename TEXT NOT NULL,
-                file_type TEXT NOT NULL,
-                file_size INTEGER,
-                upload_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                uploaded_by TEXT DEFAULT 'admin',
-                status TEXT DEFAULT 'active',
-                metadata TEXT
-            )
-        """)
-        
-        # User reports table
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS user_reports (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                question TEXT NOT NULL,
-                answer TEXT,
-                report_type TEXT NOT NULL,
-                report_reason TEXT,
-                user_comment TEXT,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                status TEXT DEFAULT 'pending',
-                resolved_at TIMESTAMP,
-                resolved_by TEXT,
-                resolution_notes TEXT
+        if version >= SCHEMA_VERSION:
+            # Up to date: skip the DDL and only read back which optional features exist
+            names = {row[0] for row in cursor.execute("SELECT name FROM sqlite_master")}
+            self.article_upsert = (
+                "idx_articles_url" in names and sqlite3.sqlite_version_info >= (3, 35, 0)
             )
-        """)
-        
-        # Chat history table
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS chat_history (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                session_id TEXT NOT NULL,
-                user_id INTEGER,
-                user_type TEXT DEFAULT 'user',
-                question TEXT NOT NULL,
-                answer TEXT NOT NULL,
-                sources TEXT,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                FOREIGN KEY (user_id) REFERENCES users (id)
-            )
-        """)
+            self.article_fts = "technical_articles_fts" in names
+            conn.close()
+            return
+        
+        conn.executescript("BEGIN;\n" + DDL_SCRIPT + "COMMIT;")
+        if version < 1:
+            # Migrate existing chat_history table if user_id column doesn't exist
+            self._migrate_chat_history_table(cursor)
+        if version < 2:
+            conn.executescript("BEGIN;\n" + CHAT_COUNTERS_SCRIPT + "COMMIT;")
+        if version < 3:
+            conn.executescript("BEGIN;\n" + DROP_TIMESTAMP_INDEXES_SCRIPT + "COMMIT;")
+        
+        conn.executescript("BEGIN;\n" + INDEX_SCRIPT + "COMMIT;")
+        # The article URL index, FTS table, triggers and rebuild commit together with the
+        # version bump, so an interrupted migration is redone in full on the next start
+        cursor.execute("BEGIN IMMEDIATE")
+        self._create_article_url_index(cursor)
+        self._create_article_fts(cursor)
+        cursor.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
         
-        # User roles and preferences table
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS user_roles (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                user_id INTEGER UNIQUE NOT NULL,
-                role_type TEXT NOT NULL,
-                department TEXT,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                FOREIGN KEY (user_id) REFERENCES users (id)
-            )
-        """)
+        conn.commit()
+        conn.close()
+    
+    def _create_article_url_index(self, cursor):
+        """Index article URLs, unique unless older data already holds duplicates"""
+        try:
+            cursor.execute("CREATE UNIQUE INDEX IF NOT EXISTS idx_articles_url ON technical_articles(url)")
+            # add_article can upsert against the unique index (RETURNING needs SQLite 3.35+)
+            self.article_upsert = sqlite3.sqlite_version_info >= (3, 35, 0)
+        except sqlite3.IntegrityError:
+            print("Migration note: duplicate article URLs found, using a non-unique URL index")
+            cursor.execute("CREATE INDEX IF NOT EXISTS idx_articles_url_dup ON technical_articles(url)")
+            self.article_upsert = False
+    
+    def _create_article_fts(self, cursor):
+        """Full-text index over article titles and summaries, kept in sync by triggers"""
+        try:
+            cursor.execute("""
+                CREATE VIRTUAL TABLE IF NOT EXISTS technical_articles_fts USING fts5(
+                    title, summary,
+                    content='technical_articles', content_rowid='id',
+                    tokenize='unicode61 remove_diacritics 2'
+                )
+            """)
+        except sqlite3.OperationalError as e:
+            # SQLite built without FTS5; title search falls back to LIKE
+            print(f"Migration note: {e}")
+            self.article_fts = False
+            return
         
-        # Technical news sources table
         cursor.execute("""
-            CREATE TABLE IF NOT EXISTS news_sources (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                source_name TEXT NOT NULL,
-                source_url TEXT NOT NULL,
-                source_type TEXT NOT NULL,
-                role_type TEXT NOT NULL,
-                update_frequency TEXT DEFAULT 'daily',
-                is_active INTEGER DEFAULT 1,
-                last_fetched TIMESTAMP,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
+            CREATE TRIGGER IF NOT EXISTS technical_articles_fts_ai AFTER INSERT ON technical_articles BEGIN
+                INSERT INTO technical_articles_fts(rowid, title, summary) VALUES (new.id, new.title, new.summary);
+            END
         """)
-        
-        # Technical articles/news table
         cursor.execute("""
-            CREATE TABLE IF NOT EXISTS technical_articles (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                source_id INTEGER,
-                title TEXT NOT NULL,
-                summary TEXT,
-                content TEXT,
-                url TEXT NOT NULL,
-                published_date TIMESTAMP,
-                role_type TEXT,
-                is_embedded INTEGER DEFAULT 0,
-                view_count INTEGER DEFAULT 0,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                FOREIGN KEY (source_id) REFERENCES news_sources (id)
-            )
+            CREATE TRIGGER IF NOT EXISTS technical_articles_fts_ad AFTER DELETE ON technical_articles BEGIN
+                INSERT INTO technical_articles_fts(technical_articles_fts, rowid, title, summary)
+                VALUES ('delete', old.id, old.title, old.summary);
+            END
         """)
-        
-        # User-uploaded documents (pending approval)
         cursor.execute("""
-            CREATE TABLE IF NOT EXISTS user_documents (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                filename TEXT NOT NULL,
-                original_filename TEXT NOT NULL,
-                file_type TEXT NOT NULL,
-                file_size INTEGER,
-                uploaded_by INTEGER NOT NULL,
-                role_type TEXT,
-                description TEXT,
-                status TEXT DEFAULT 'pending',
-                approved_by INTEGER,
-                approved_at TIMESTAMP,
-                rejection_reason TEXT,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                FOREIGN KEY (uploaded_by) REFERENCES users (id),
-                FOREIGN KEY (approved_by) REFERENCES users (id)
-            )
+            CREATE TRIGGER IF NOT EXISTS technical_articles_fts_au AFTER UPDATE OF title, summary ON technical_articles BEGIN
+                INSERT INTO technical_articles_fts(technical_articles_fts, rowid, title, summary)
+                VALUES ('delete', old.id, old.title, old.summary);
+                INSERT INTO technical_articles_fts(rowid, title, summary) VALUES (new.id, new.title, new.summary);
+            END
         """)
-        
-        # Migrate existing chat_history table if user_id column doesn't exist
-        self._migrate_chat_history_table(cursor)
-        
-        conn.commit()
-        conn.close()
+        # Index the articles stored before the FTS table existed; this only runs while migrating
+        cursor.execute("INSERT INTO technical_articles_fts(technical_articles_fts) VALUES ('rebuild')")
+        self.article_fts = True
     
     def _migrate_chat_history_table(self, cursor):
         """Add user_id column to chat_history if it doesn't exist"""
         try:
             # Check if user_id column exists
             cursor.execute("PRAGMA table_info(chat_history)")
-            columns = [column[1] for column in cursor.fetchall()]
+            columns = [column[1] for column in cursor]
             
             if 'user_id' not in columns:
                 print("Migrating chat_history table to add user_id column...")
@@ -167,6 +589,7 @@ class DocumentManager:
     
     def __init__(self, db: Database):
         self.db = db
+        self._document_cache = _ReadCache(ttl=5.0)
     
     def add_document(
         self,
@@ -181,17 +604,13 @@ class DocumentManager:
         conn = self.db.get_connection()
         cursor = conn.cursor()
         
-        cursor.execute("""
-            INSERT INTO documents 
-            (filename, original_filename, file_type, file_size, uploaded_by, metadata)
-            VALUES (?, ?, ?, ?, ?, ?)
-        """, (
+        cursor.execute(SQL_ADD_DOCUMENT, (
             filename,
             original_filename,
             file_type,
             file_size,
             uploaded_by,
-            json.dumps(metadata) if metadata else None
+            _dump_json(metadata)
         ))
         
         doc_id = cursor.lastrowid
@@ -200,19 +619,46 @@ class DocumentManager:
         
         return doc_id
     
-    def get_all_documents(self) -> List[Dict]:
-        """Get all documents"""
+    def add_documents(self, documents: List[Dict]) -> List[int]:
+        """Add many documents in one transaction; each dict takes add_document's arguments"""
+        if not documents:
+            return []
+        
         conn = self.db.get_connection()
-        conn.row_factory = sqlite3.Row
         cursor = conn.cursor()
         
+        # One commit for the whole batch; ids are read per row, which executemany cannot do
+        cursor.execute("BEGIN IMMEDIATE")
+        doc_ids = []
+        for doc in documents:
+            cursor.execute(SQL_ADD_DOCUMENT, (
+                doc["filename"],
+                doc["original_filename"],
+                doc["file_type"],
+                doc["file_size"],
+                doc.get("uploaded_by", "admin"),
+                _dump_json(doc.get("metadata"))
+            ))
+            doc_ids.append(cursor.lastrowid)
+        
+        conn.commit()
+        conn.close()
+        
+        return doc_ids
+    
+    def get_all_documents(self, limit: Optional[int] = None, offset: int = 0) -> List[Dict]:
+        """Get all documents, optionally one page of them"""
+        conn = self.db.get_read_connection()
+        cursor = conn.cursor()
+        page, page_params = _page(limit, offset)
+        
         cursor.execute("""
             SELECT * FROM documents 
             WHERE status = 'active'
-            ORDER BY upload_date DESC
-        """)
+            ORDER BY id DESC
+        """ + page, page_params)
         
-        documents = [dict(row) for row in cursor.fetchall()]
+        documents = _fetch_dicts(cursor)
         conn.close()
         
         return documents
@@ -231,20 +677,53 @@ class DocumentManager:
         success = cursor.rowcount > 0
         conn.commit()
         conn.close()
+        self._document_cache.invalidate(doc_id)
         
         return success
     
     def get_document(self, doc_id: int) -> Optional[Dict]:
         """Get a specific document"""
-        conn = self.db.get_connection()
-        conn.row_factory = sqlite3.Row
+        cached = self._document_cache.get(doc_id)
+        if cached is not None:
+            return cached
+        
+        conn = self.db.get_read_connection()
         cursor = conn.cursor()
         
-        cursor.execute("SELECT * FROM documents WHERE id = ?", (doc_id,))
-        row = cursor.fetchone()
+        cursor.execute(SQL_GET_DOCUMENT, (doc_id,))
+        row = _fetch_dict(cursor)
         conn.close()
         
-        return dict(row) if row else None
+        if row is not None:
+            self._document_cache.set(doc_id, row)
+        return row
+    
+    def get_documents_by_ids(self, doc_ids) -> Dict[int, Dict]:
+        """Get several documents in one query, keyed by id; missing ids are left out"""
+        documents = {}
+        missing = []
+        for doc_id in set(doc_ids):
+            cached = self._document_cache.get(doc_id)
+            if cached is not None:
+                documents[doc_id] = cached
+            else:
+                missing.append(doc_id)
+        
+        if missing:
+            conn = self.db.get_read_connection()
+            cursor = conn.cursor()
+            
+            # Chunk to stay under SQLite's bound-parameter limit
+            for start in range(0, len(missing), 500):
+                chunk = missing[start:start + 500]
+                placeholders = ",".join("?" * len(chunk))
+                cursor.execute(f"SELECT * FROM documents WHERE id IN ({placeholders})", chunk)
+                for row in _fetch_dicts(cursor):
+                    self._document_cache.set(row["id"], row)
+                    documents[row["id"]] = row
+            conn.close()
+        
+        return documents
 
 
 class ReportManager:
@@ -265,11 +744,7 @@ class ReportManager:
         conn = self.db.get_connection()
         cursor = conn.cursor()
         
-        cursor.execute("""
-            INSERT INTO user_reports 
-            (question, answer, report_type, report_reason, user_comment)
-            VALUES (?, ?, ?, ?, ?)
-        """, (question, answer, report_type, report_reason, user_comment))
+        cursor.execute(SQL_CREATE_REPORT, (question, answer, report_type, report_reason, user_comment))
         
         report_id = cursor.lastrowid
         conn.commit()
@@ -277,25 +752,30 @@ class ReportManager:
         
         return report_id
     
-    def get_all_reports(self, status: Optional[str] = None) -> List[Dict]:
-        """Get all reports, optionally filtered by status"""
-        conn = self.db.get_connection()
-        conn.row_factory = sqlite3.Row
+    def get_all_reports(
+        self,
+        status: Optional[str] = None,
+        limit: Optional[int] = None,
+        offset: int = 0
+    ) -> List[Dict]:
+        """Get all reports, optionally filtered by status and paged"""
+        conn = self.db.get_read_connection()
         cursor = conn.cursor()
+        page, page_params = _page(limit, offset)
         
         if status:
             cursor.execute("""
                 SELECT * FROM user_reports 
                 WHERE status = ?
-                ORDER BY created_at DESC
-            """, (status,))
+                ORDER BY id DESC
+            """ + page, (status,) + page_params)
         else:
             cursor.execute("""
                 SELECT * FROM user_reports 
-                ORDER BY created_at DESC
-            """)
+                ORDER BY id DESC
+            """ + page, page_params)
         
-        reports = [dict(row) for row in cursor.fetchall()]
+        reports = _fetch_dicts(cursor)
         conn.close()
         
         return reports
@@ -310,14 +790,7 @@ class ReportManager:
         conn = self.db.get_connection()
         cursor = conn.cursor()
         
-        cursor.execute("""
-            UPDATE user_reports 
-            SET status = 'resolved',
-                resolved_at = CURRENT_TIMESTAMP,
-                resolved_by = ?,
-                resolution_notes = ?
-            WHERE id = ?
-        """, (resolved_by, resolution_notes, report_id))
+        cursor.execute(SQL_RESOLVE_REPORT, (resolved_by, resolution_notes, report_id))
         
         success = cursor.rowcount > 0
         conn.commit()
@@ -327,15 +800,14 @@ class ReportManager:
     
     def get_report(self, report_id: int) -> Optional[Dict]:
         """Get a specific report"""
-        conn = self.db.get_connection()
-        conn.row_factory = sqlite3.Row
+        conn = self.db.get_read_connection()
         cursor = conn.cursor()
         
         cursor.execute("SELECT * FROM user_reports WHERE id = ?", (report_id,))
-        row = cursor.fetchone()
+        row = _fetch_dict(cursor)
         conn.close()
         
-        return dict(row) if row else None
+        return row
 
 
 class ChatHistoryManager:
@@ -357,17 +829,13 @@ class ChatHistoryManager:
         conn = self.db.get_connection()
         cursor = conn.cursor()
         
-        cursor.execute("""
-            INSERT INTO chat_history 
-            (session_id, user_id, user_type, question, answer, sources)
-            VALUES (?, ?, ?, ?, ?, ?)
-        """, (
+        cursor.execute(SQL_ADD_CHAT, (
             session_id,
             user_id,
             user_type,
             question,
             answer,
-            json.dumps(sources) if sources else None
+            _dump_json(sources)
         ))
         
         chat_id = cursor.lastrowid
@@ -376,68 +844,115 @@ class ChatHistoryManager:
         
         return chat_id
     
+    def add_chat_async(
+        self,
+        session_id: str,
+        question: str,
+        answer: str,
+        sources: Optional[List[Dict]] = None,
+        user_type: str = "user",
+        user_id: Optional[int] = None
+    ) -> None:
+        """Record a chat interaction without waiting for the commit"""
+        params = (session_id, user_id, user_type, question, answer, _dump_json(sources))
+        if not self.db.write_buffer.put(SQL_ADD_CHAT, params):
+            self.add_chat(session_id, question, answer, sources, user_type, user_id)
+    
+    def add_chats(self, chats: List[Dict]) -> int:
+        """Add many chat interactions in one transaction; each dict takes add_chat's arguments"""
+        conn = self.db.get_connection()
+        cursor = conn.cursor()
+        
+        cursor.execute("BEGIN IMMEDIATE")
+        cursor.executemany(SQL_ADD_CHAT, [
+            (
+                chat["session_id"],
+                chat.get("user_id"),
+                chat.get("user_type", "user"),
+                chat["question"],
+                chat["answer"],
+                _dump_json(chat.get("sources")),
+            )
+            for chat in chats
+        ])
+        
+        count = cursor.rowcount
+        conn.commit()
+        conn.close()
+        
+        return count
+    
     def get_session_history(self, session_id: str) -> List[Dict]:
         """Get chat history for a session"""
-        conn = self.db.get_connection()
-        conn.row_factory = sqlite3.Row
+        conn = self.db.get_read_connection()
         cursor = conn.cursor()
         
-        cursor.execute("""
-            SELECT * FROM chat_history 
-            WHERE session_id = ?
-            ORDER BY created_at ASC
-        """, (session_id,))
+        cursor.execute(SQL_GET_SESSION_HISTORY, (session_id,))
         
-        history = [dict(row) for row in cursor.fetchall()]
+        history = _fetch_dicts(cursor)
         conn.close()
         
         return history
     
     def get_chat_count(self) -> int:
         """Get total number of chats"""
-        conn = self.db.get_connection()
+        conn = self.db.get_read_connection()
         cursor = conn.cursor()
         
-        cursor.execute("SELECT COUNT(*) FROM chat_history")
-        count = cursor.fetchone()[0]
+        cursor.execute(SQL_GET_CHAT_COUNT)
+        row = cursor.fetchone()
         conn.close()
         
-        return count
+        return row[0] if row else 0
     
-    def get_user_history(self, user_id: int) -> List[Dict]:
-        """Get all chat history for a specific user"""
-        conn = self.db.get_connection()
-        conn.row_factory = sqlite3.Row
+    def get_user_history(self, user_id: int, limit: Optional[int] = None, offset: int = 0) -> List[Dict]:
+        """Get all chat history for a specific user, optionally one page of it"""
+        conn = self.db.get_read_connection()
         cursor = conn.cursor()
+        page, page_params = _page(limit, offset)
         
         cursor.execute("""
             SELECT * FROM chat_history 
             WHERE user_id = ?
-            ORDER BY created_at DESC
-        """, (user_id,))
+            ORDER BY id DESC
+        """ + page, (user_id,) + page_params)
         
-        history = [dict(row) for row in cursor.fetchall()]
+        history = _fetch_dicts(cursor)
         conn.close()
         
         return history
     
     def get_user_chat_count(self, user_id: int) -> int:
         """Get total number of chats for a specific user"""
-        conn = self.db.get_connection()
+        conn = self.db.get_read_connection()
         cursor = conn.cursor()
         
-        cursor.execute("SELECT COUNT(*) FROM chat_history WHERE user_id = ?", (user_id,))
-        count = cursor.fetchone()[0]
+        cursor.execute(SQL_GET_USER_CHAT_COUNT, (user_id,))
+        row = cursor.fetchone()
         conn.close()
         
-        return count
+        return row[0] if row else 0
+
+
+@functools.cache
+def get_db() -> Database:
+    """Get the global database instance, initializing the schema on first use"""
+    return Database()
+
+
+@functools.cache
+def get_document_manager() -> DocumentManager:
+    return DocumentManager(get_db())
+
+
+@functools.cache
+def get_report_manager() -> ReportManager:
+    return ReportManager(get_db())
 
 
-# Initialize global database instance
-db = Database()
-document_manager = DocumentManager(db)
-report_manager = ReportManager(db)
-chat_history_manager = ChatHistoryManager(db)
+@functools.cache
+def get_chat_history_manager() -> ChatHistoryManager:
+    return ChatHistoryManager(get_db())
 
 
 class UserRoleManager:
@@ -445,6 +960,7 @@ class UserRoleManager:
     
     def __init__(self, db: Database):
         self.db = db
+        self._role_cache = _ReadCache(ttl=5.0, maxsize=4096)
     
     def set_user_role(self, user_id: int, role_type: str, department: str = None) -> bool:
         """Set or update user's role"""
@@ -469,19 +985,25 @@ class UserRoleManager:
         
         conn.commit()
         conn.close()
+        self._role_cache.invalidate(user_id)
         return True
     
     def get_user_role(self, user_id: int) -> Optional[Dict]:
         """Get user's role"""
-        conn = self.db.get_connection()
-        conn.row_factory = sqlite3.Row
+        cached = self._role_cache.get(user_id)
+        if cached is not None:
+            return cached
+        
+        conn = self.db.get_read_connection()
         cursor = conn.cursor()
         
         cursor.execute("SELECT * FROM user_roles WHERE user_id = ?", (user_id,))
-        row = cursor.fetchone()
+        row = _fetch_dict(cursor)
         conn.close()
         
-        return dict(row) if row else None
+        if row is not None:
+            self._role_cache.set(user_id, row)
+        return row
 
 
 class NewsManager:
@@ -489,6 +1011,9 @@ class NewsManager:
     
     def __init__(self, db: Database):
         self.db = db
+        # Sources change rarely; articles change on content fetch, embedding and views
+        self._sources_cache = _ReadCache(ttl=60.0, maxsize=64)
+        self._article_cache = _ReadCache(ttl=5.0)
     
     def add_news_source(self, source_name: str, source_url: str, source_type: str, 
                         role_type: str, update_frequency: str = 'daily') -> int:
@@ -505,12 +1030,16 @@ class NewsManager:
         source_id = cursor.lastrowid
         conn.commit()
         conn.close()
+        self._sources_cache.invalidate(role_type)
         return source_id
     
     def get_sources_by_role(self, role_type: str) -> List[Dict]:
         """Get news sources for a specific role"""
-        conn = self.db.get_connection()
-        conn.row_factory = sqlite3.Row
+        cached = self._sources_cache.get(role_type)
+        if cached is not None:
+            return cached
+        
+        conn = self.db.get_read_connection()
         cursor = conn.cursor()
         
         cursor.execute("""
@@ -519,8 +1048,9 @@ class NewsManager:
             ORDER BY source_name
         """, (role_type,))
         
-        sources = [dict(row) for row in cursor.fetchall()]
+        sources = _fetch_dicts(cursor)
         conn.close()
+        self._sources_cache.set(role_type, sources)
         return sources
     
     def add_article(self, source_id: int, title: str, summary: str, content: str,
@@ -528,6 +1058,16 @@ class NewsManager:
         """Add a new article"""
         conn = self.db.get_connection()
         cursor = conn.cursor()
+        params = (source_id, title, summary, content, url, published_date, role_type)
+        
+        if self.db.article_upsert:
+            # One statement; a known URL inserts nothing and returns no row
+            row = cursor.execute(SQL_UPSERT_ARTICLE, params).fetchone()
+            if row is None:
+                row = cursor.execute("SELECT id FROM technical_articles WHERE url = ?", (url,)).fetchone()
+            conn.commit()
+            conn.close()
+            return row[0]
         
         # Check if article already exists (by URL)
         cursor.execute("SELECT id FROM technical_articles WHERE url = ?", (url,))
@@ -537,21 +1077,54 @@ class NewsManager:
             conn.close()
             return existing[0]
         
-        cursor.execute("""
-            INSERT INTO technical_articles 
-            (source_id, title, summary, content, url, published_date, role_type)
-            VALUES (?, ?, ?, ?, ?, ?, ?)
-        """, (source_id, title, summary, content, url, published_date, role_type))
+        cursor.execute(SQL_ADD_ARTICLE, params)
         
         article_id = cursor.lastrowid
         conn.commit()
         conn.close()
         return article_id
     
+    def add_articles(self, rows: List[Tuple]) -> List[int]:
+        """Add many articles in one transaction, skipping known URLs
+
+        Rows are (source_id, title, summary, content, url, published_date, role_type);
+        returns the article id for each row, in order
+        """
+        if not rows:
+            return []
+        
+        conn = self.db.get_connection()
+        cursor = conn.cursor()
+        
+        cursor.execute("BEGIN IMMEDIATE")
+        if self.db.article_upsert:
+            cursor.executemany(SQL_ADD_ARTICLE + "ON CONFLICT(url) DO NOTHING\n", rows)
+        else:
+            # No unique URL index to lean on; check each URL inside the same transaction
+            for row in rows:
+                cursor.execute("SELECT 1 FROM technical_articles WHERE url = ?", (row[4],))
+                if cursor.fetchone() is None:
+                    cursor.execute(SQL_ADD_ARTICLE, row)
+        
+        # Read the ids back by URL, in chunks below SQLite's host parameter limit
+        urls = list(dict.fromkeys(row[4] for row in rows))
+        ids = {}
+        for start in range(0, len(urls), 500):
+            chunk = urls[start:start + 500]
+            placeholders = ','.join('?' for _ in chunk)
+            cursor.execute(
+                f"SELECT url, MIN(id) FROM technical_articles WHERE url IN ({placeholders}) GROUP BY url",
+                chunk
+            )
+            ids.update(cursor)
+        
+        conn.commit()
+        conn.close()
+        return [ids[row[4]] for row in rows]
+    
     def get_articles_by_role(self, role_type: str, limit: int = 20) -> List[Dict]:
         """Get recent articles for a specific role"""
-        conn = self.db.get_connection()
-        conn.row_factory = sqlite3.Row
+        conn = self.db.get_read_connection()
         cursor = conn.cursor()
         
         cursor.execute("""
@@ -563,19 +1136,23 @@ class NewsManager:
             LIMIT ?
         """, (role_type, limit))
         
-        articles = [dict(row) for row in cursor.fetchall()]
+        articles = _fetch_dicts(cursor)
         conn.close()
         return articles
 
     def get_article_by_id(self, article_id: int) -> Optional[Dict]:
         """Fetch a single article by ID."""
-        conn = self.db.get_connection()
-        conn.row_factory = sqlite3.Row
+        cached = self._article_cache.get(article_id)
+        if cached is not None:
+            return cached
+        conn = self.db.get_read_connection()
         cursor = conn.cursor()
         cursor.execute("SELECT a.*, s.source_name FROM technical_articles a LEFT JOIN news_sources s ON a.source_id = s.id WHERE a.id = ?", (article_id,))
-        row = cursor.fetchone()
+        row = _fetch_dict(cursor)
         conn.close()
-        return dict(row) if row else None
+        if row is not None:
+            self._article_cache.set(article_id, row)
+        return row
 
     def update_article_content(self, article_id: int, content: str) -> bool:
         """Persist fetched article content."""
@@ -585,6 +1162,7 @@ class NewsManager:
         success = cursor.rowcount > 0
         conn.commit()
         conn.close()
+        self._article_cache.invalidate(article_id)
         return success
     
     def mark_article_embedded(self, article_id: int) -> bool:
@@ -592,15 +1170,12 @@ class NewsManager:
         conn = self.db.get_connection()
         cursor = conn.cursor()
         
-        cursor.execute("""
-            UPDATE technical_articles 
-            SET is_embedded = 1
-            WHERE id = ?
-        """, (article_id,))
+        cursor.execute(SQL_MARK_ARTICLE_EMBEDDED, (article_id,))
         
         success = cursor.rowcount > 0
         conn.commit()
         conn.close()
+        self._article_cache.invalidate(article_id)
         return success
     
     def increment_view_count(self, article_id: int) -> bool:
@@ -608,25 +1183,73 @@ class NewsManager:
         conn = self.db.get_connection()
         cursor = conn.cursor()
         
-        cursor.execute("""
-            UPDATE technical_articles 
-            SET view_count = view_count + 1
-            WHERE id = ?
-        """, (article_id,))
+        cursor.execute(SQL_INCREMENT_VIEW_COUNT, (article_id,))
         
         conn.commit()
         conn.close()
+        self._article_cache.invalidate(article_id)
         return True
+    
+    def increment_view_count_async(self, article_id: int) -> None:
+        """Count an article view without waiting for the commit"""
+        if self.db.write_buffer.put(SQL_INCREMENT_VIEW_COUNT, (article_id,)):
+            self._article_cache.invalidate(article_id)
+        else:
+            self.increment_view_count(article_id)
+    
+    def increment_view_counts(self, article_ids: List[int]) -> int:
+        """Apply a buffer of article views in one transaction; repeated ids add up"""
+        views = Counter(article_ids)
+        if not views:
+            return 0
+        
+        conn = self.db.get_connection()
+        cursor = conn.cursor()
+        
+        cursor.execute("BEGIN IMMEDIATE")
+        cursor.executemany(
+            "UPDATE technical_articles SET view_count = view_count + ? WHERE id = ?",
+            [(count, article_id) for article_id, count in views.items()]
+        )
+        
+        updated = cursor.rowcount
+        conn.commit()
+        conn.close()
+        for article_id in views:
+            self._article_cache.invalidate(article_id)
+        return updated
 
     def find_article_by_title(self, title_query: str) -> Optional[Dict]:
         """Find a single article whose title matches the provided text."""
         if not title_query:
             return None
 
-        conn = self.db.get_connection()
-        conn.row_factory = sqlite3.Row
+        conn = self.db.get_read_connection()
         cursor = conn.cursor()
 
+        if self.db.article_fts:
+            # Every query word must prefix-match a title word; best BM25 match first
+            terms = re.findall(r"\w+", title_query)
+            if not terms:
+                conn.close()
+                return None
+            match = "title : (" + " ".join(f'"{term}"*' for term in terms) + ")"
+            cursor.execute(
+                """
+                SELECT a.*, s.source_name
+                FROM technical_articles_fts f
+                JOIN technical_articles a ON a.id = f.rowid
+                LEFT JOIN news_sources s ON a.source_id = s.id
+                WHERE technical_articles_fts MATCH ?
+                ORDER BY bm25(technical_articles_fts), a.published_date DESC
+                LIMIT 1
+                """,
+                (match,)
+            )
+            row = _fetch_dict(cursor)
+            conn.close()
+            return row
+
         cursor.execute(
             """
             SELECT a.*, s.source_name
@@ -639,9 +1262,9 @@ class NewsManager:
             (f"%{title_query}%",)
         )
 
-        row = cursor.fetchone()
+        row = _fetch_dict(cursor)
         conn.close()
-        return dict(row) if row else None
+        return row
 
 
 class UserDocumentManager:
@@ -652,44 +1275,128 @@ class UserDocumentManager:
         # Auth database stores user profile information (username/full name)
         base_path = Path(self.db.db_path)
         self.auth_db_path = str(base_path.with_name('knowledge_base.db'))
+        self._auth_local = threading.local()
+        self._auth_checked = False
+        self._auth_recheck_at = 0.0
+
+    def _ensure_auth_db(self) -> bool:
+        """Check the auth DB exists, creating its users table once if the DB predates it"""
+        if self._auth_checked:
+            return True
+        # Until the auth DB appears, look for it at most every few seconds rather than per call
+        now = time.monotonic()
+        if now < self._auth_recheck_at:
+            return False
+        if not os.path.exists(self.auth_db_path):
+            self._auth_recheck_at = now + 5.0
+            return False
+
+        # Create the users table once if the auth DB predates it
+        probe = sqlite3.connect(self.auth_db_path)
+        has_users = probe.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'users'"
+        ).fetchone()
+        probe.close()
+        if not has_users:
+            try:
+                from rag_chatbot.auth import AuthManager
+                AuthManager(self.auth_db_path)
+            except Exception as bootstrap_err:
+                print(f"Warning: could not initialize auth DB: {bootstrap_err}")
+        self._auth_checked = True
+        return True
 
-    def _get_user_info_map(self, user_ids: List[int], _retry: bool = False) -> Dict[int, Dict]:
+    def _auth_conn(self) -> Optional[sqlite3.Connection]:
+        """Return this thread's auth DB connection, or None while the auth DB does not exist"""
+        conn = getattr(self._auth_local, "conn", None)
+        if conn is not None:
+            return conn
+        if not self._ensure_auth_db():
+            return None
+
+        conn = sqlite3.connect(self.auth_db_path, check_same_thread=False)
+        self._auth_local.conn = Database._configure(conn)
+        return conn
+
+    def _get_user_info_map(self, user_ids: List[int]) -> Dict[int, Dict]:
         """Fetch user info for provided IDs from authentication database."""
         unique_ids = sorted({uid for uid in user_ids if uid})
         if not unique_ids:
             return {}
 
-        auth_path = Path(self.auth_db_path)
-        if not auth_path.exists():
-            return {}
-
         try:
-            conn = sqlite3.connect(self.auth_db_path)
-            conn.row_factory = sqlite3.Row
-            cursor = conn.cursor()
+            conn = self._auth_conn()
+            if conn is None:
+                return {}
             placeholders = ','.join('?' for _ in unique_ids)
-            cursor.execute(
+            cursor = conn.execute(
                 f"SELECT id, username, full_name, email FROM users WHERE id IN ({placeholders})",
                 tuple(unique_ids)
             )
-            user_map = {row['id']: dict(row) for row in cursor.fetchall()}
-            conn.close()
-            return user_map
-        except sqlite3.OperationalError as exc:
-            message = str(exc).lower()
-            if "no such table" in message and "users" in message and not _retry:
-                try:
-                    from rag_chatbot.auth import AuthManager
-                    AuthManager(self.auth_db_path)
-                    return self._get_user_info_map(user_ids, _retry=True)
-                except Exception as bootstrap_err:
-                    print(f"Warning: could not initialize auth DB: {bootstrap_err}")
-            print(f"Warning: could not load uploader info: {exc}")
-            return {}
+            return {user['id']: user for user in _fetch_dicts(cursor)}
         except Exception as e:
             print(f"Warning: could not load uploader info: {e}")
             return {}
 
+    def _attach_auth_db(self, conn: sqlite3.Connection) -> bool:
+        """Attach the auth DB to a pooled connection as `auth`, once per connection"""
+        if getattr(conn, "auth_attached", False):
+            return True
+        # ATTACH would create an empty file, so wait until the auth DB exists
+        if not self._ensure_auth_db():
+            return False
+        try:
+            conn.execute("ATTACH DATABASE ? AS auth", (self.auth_db_path,))
+            conn.auth_attached = True
+            return True
+        except sqlite3.Error as e:
+            print(f"Warning: could not attach auth DB: {e}")
+            return False
+
+    def _list_documents(
+        self,
+        where: str,
+        params: tuple,
+        order_by: str,
+        limit: Optional[int] = None,
+        offset: int = 0
+    ) -> List[Dict]:
+        """List user documents with uploader fields, joined from the auth DB in one query"""
+        conn = self.db.get_read_connection()
+        page, page_params = _page(limit, offset)
+        order_by += page
+        params += page_params
+
+        if not self._attach_auth_db(conn):
+            documents = _fetch_dicts(
+                conn.execute(f"SELECT * FROM user_documents ud WHERE {where} ORDER BY {order_by}", params)
+            )
+            conn.close()
+            return self._attach_uploader_metadata(documents)
+
+        try:
+            cursor = conn.execute(f"""
+                SELECT ud.*,
+                    CASE WHEN ud.uploaded_by THEN COALESCE(
+                        NULLIF(u.full_name, ''), NULLIF(u.username, ''), 'User #' || ud.uploaded_by
+                    ) ELSE 'Unknown' END AS uploader_name,
+                    u.username AS uploader_username,
+                    u.email AS uploader_email
+                FROM user_documents ud
+                LEFT JOIN auth.users u ON u.id = ud.uploaded_by
+                WHERE {where}
+                ORDER BY {order_by}
+            """, params)
+            documents = _fetch_dicts(cursor)
+        except sqlite3.Error as e:
+            print(f"Warning: could not load uploader info: {e}")
+            documents = _fetch_dicts(
+                conn.execute(f"SELECT * FROM user_documents ud WHERE {where} ORDER BY {order_by}", params)
+            )
+            documents = self._attach_uploader_metadata(documents)
+        conn.close()
+        return documents
+
     def _attach_uploader_metadata(self, documents: List[Dict]) -> List[Dict]:
         """Add uploader_name/email fields using auth database (best effort)."""
         user_ids = [doc.get('uploaded_by') for doc in documents if doc.get('uploaded_by')]
@@ -727,37 +1434,13 @@ class UserDocumentManager:
         conn.close()
         return doc_id
     
-    def get_pending_documents(self) -> List[Dict]:
-        """Get all documents pending approval"""
-        conn = self.db.get_connection()
-        conn.row_factory = sqlite3.Row
-        cursor = conn.cursor()
-        
-        cursor.execute("""
-            SELECT * FROM user_documents 
-            WHERE status = 'pending'
-            ORDER BY created_at DESC
-        """)
-        
-        documents = [dict(row) for row in cursor.fetchall()]
-        conn.close()
-        return self._attach_uploader_metadata(documents)
+    def get_pending_documents(self, limit: Optional[int] = None, offset: int = 0) -> List[Dict]:
+        """Get all documents pending approval, optionally one page of them"""
+        return self._list_documents("ud.status = 'pending'", (), "ud.id DESC", limit, offset)
     
     def get_user_documents(self, user_id: int) -> List[Dict]:
         """Get all documents uploaded by a user"""
-        conn = self.db.get_connection()
-        conn.row_factory = sqlite3.Row
-        cursor = conn.cursor()
-        
-        cursor.execute("""
-            SELECT * FROM user_documents 
-            WHERE uploaded_by = ?
-            ORDER BY created_at DESC
-        """, (user_id,))
-        
-        documents = [dict(row) for row in cursor.fetchall()]
-        conn.close()
-        return self._attach_uploader_metadata(documents)
+        return self._list_documents("ud.uploaded_by = ?", (user_id,), "ud.id DESC")
     
     def approve_document(self, doc_id: int, approved_by: int) -> bool:
         """Approve a user document"""
@@ -792,36 +1475,61 @@ class UserDocumentManager:
         conn.close()
         return success
     
-    def get_approved_documents_by_role(self, role_type: str) -> List[Dict]:
-        """Get all approved documents for a role"""
-        conn = self.db.get_connection()
-        conn.row_factory = sqlite3.Row
-        cursor = conn.cursor()
-        
-        cursor.execute("""
-            SELECT * FROM user_documents 
-            WHERE status = 'approved' AND role_type = ?
-            ORDER BY (approved_at IS NULL), approved_at DESC, created_at DESC
-        """, (role_type,))
-        
-        documents = [dict(row) for row in cursor.fetchall()]
-        conn.close()
-        return self._attach_uploader_metadata(documents)
+    def get_approved_documents_by_role(
+        self,
+        role_type: str,
+        limit: Optional[int] = None,
+        offset: int = 0
+    ) -> List[Dict]:
+        """Get all approved documents for a role, optionally one page of them"""
+        return self._list_documents(
+            "ud.status = 'approved' AND ud.role_type = ?",
+            (role_type,),
+            "(ud.approved_at IS NULL), ud.approved_at DESC, ud.id DESC",
+            limit,
+            offset,
+        )
     
     def get_document(self, doc_id: int) -> Optional[Dict]:
         """Get a specific user document"""
-        conn = self.db.get_connection()
-        conn.row_factory = sqlite3.Row
+        conn = self.db.get_read_connection()
         cursor = conn.cursor()
         
         cursor.execute("SELECT * FROM user_documents WHERE id = ?", (doc_id,))
-        row = cursor.fetchone()
+        row = _fetch_dict(cursor)
         conn.close()
         
-        return dict(row) if row else None
+        return row
+
+
+@functools.cache
+def get_user_role_manager() -> UserRoleManager:
+    return UserRoleManager(get_db())
+
+
+@functools.cache
+def get_news_manager() -> NewsManager:
+    return NewsManager(get_db())
+
+
+@functools.cache
+def get_user_document_manager() -> UserDocumentManager:
+    return UserDocumentManager(get_db())
+
+
+# Global instances, created on first access (`from rag_chatbot.database import db` still works)
+_LAZY_GLOBALS = {
+    "db": get_db,
+    "document_manager": get_document_manager,
+    "report_manager": get_report_manager,
+    "chat_history_manager": get_chat_history_manager,
+    "user_role_manager": get_user_role_manager,
+    "news_manager": get_news_manager,
+    "user_document_manager": get_user_document_manager,
+}
 
 
-# Initialize global managers
-user_role_manager = UserRoleManager(db)
-news_manager = NewsManager(db)
-user_document_manager = UserDocumentManager(db)
+def __getattr__(name: str):
+    if name in _LAZY_GLOBALS:
+        return _LAZY_GLOBALS[name]()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -36,7 +36,8 @@ class RAGPipelineEvaluator:
         self._setting = RAGSettings()
         if llm not in ["gpt-3.5-turbo", "gpt-4", "gpt-4o", "gpt-4-turbo"]:
             print("Pulling LLM model")
-            LocalRAGModel.pull(host=host, model_name=llm)
+            for _ in LocalRAGModel.iter_pull_progress(host=host, model_name=llm):
+                pass
             print("Pulling complete")
         self._llm = LocalRAGModel.set(model_name=llm, host=host)
         self._teacher = LocalRAGModel.set(model_name=teacher, host=host)
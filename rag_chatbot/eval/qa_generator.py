@@ -96,7 +96,7 @@ class QAGenerator:
         if os.path.exists(os.path.join(output_dir, "docstore.json")):
             print("Docstore already exist! Skip ingestion.")
 
-        nodes = self._ingestion.store_nodes(input_files, embed_nodes=True)
+        nodes = self._ingestion.store_nodes(input_files, embed_nodes=True, use_processes=True)
         random.shuffle(nodes)
         dataset = generate_question_context_pairs(
             nodes=nodes[:max_nodes],
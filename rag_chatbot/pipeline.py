@@ -10,14 +10,14 @@ from .core import (
 from llama_index.core import Settings
 from llama_index.core.chat_engine.types import StreamingAgentChatResponse
 from llama_index.core.prompts import ChatMessage, MessageRole
-from .setting import RAGSettings
+from .setting import get_settings
 import os
 
 
 class LocalRAGPipeline:
     def __init__(self, host: str = "localhost", auto_init_docs: bool = True, use_gemini: bool = False, gemini_api_key: str = None) -> None:
         # Load settings
-        self._settings = RAGSettings()
+        self._settings = get_settings()
         self._host = host
         self._language = "eng"
         self._use_gemini = use_gemini
@@ -39,6 +39,7 @@ class LocalRAGPipeline:
         self._system_prompt = get_system_prompt("eng", is_rag_prompt=False)
         self._engine = LocalChatEngine(host=host)
         self._query_engine = None
+        self._history_cache = ([], [])
         self._ingestion = LocalDataIngestion()
         self._vector_store = LocalVectorStore(host=host)
         # Defer embedding model loading until needed (when documents are uploaded)
@@ -47,9 +48,10 @@ class LocalRAGPipeline:
         
         # Initialize query engine with existing documents if available
         if auto_init_docs:
-            self._initialize_existing_documents()
+            # Startup runs on the main thread before any server threads, so it may use worker processes
+            self._initialize_existing_documents(use_processes=True)
     
-    def _initialize_existing_documents(self):
+    def _initialize_existing_documents(self, use_processes: bool = False):
         """Load existing documents from database - uses cached embeddings when available"""
         try:
             from rag_chatbot.database import document_manager
@@ -66,11 +68,15 @@ class LocalRAGPipeline:
                 # Documents exist, need to load them (cache will be used if available)
                 self._ensure_embed_model()
                 
-                # Collect all file paths
+                # Collect all file paths, listing the data directory once instead of stat-ing each file
+                try:
+                    existing_files = set(os.listdir("data/data"))
+                except OSError:
+                    existing_files = set()
                 file_paths = []
                 for doc in docs:
                     file_path = os.path.join("data/data", doc["filename"])
-                    if os.path.exists(file_path):
+                    if doc["filename"] in existing_files:
                         file_paths.append(file_path)
                     else:
                         print(f"[STARTUP] Warning: File not found: {file_path}")
@@ -81,7 +87,8 @@ class LocalRAGPipeline:
                     all_nodes = self._ingestion.store_nodes(
                         input_files=file_paths,
                         embed_nodes=True,
-                        embed_model=Settings.embed_model
+                        embed_model=Settings.embed_model,
+                        use_processes=use_processes,
                     )
                     
                     if all_nodes:
@@ -196,12 +203,22 @@ class LocalRAGPipeline:
         )
 
     def get_history(self, chatbot: list[list[str]]):
-        history = []
-        for chat in chatbot:
-            if chat[0]:
-                history.append(ChatMessage(role=MessageRole.USER, content=chat[0]))
-                history.append(ChatMessage(role=MessageRole.ASSISTANT, content=chat[1]))
-        return history
+        turns = [(chat[0], chat[1]) for chat in chatbot if chat[0]]
+        # Reuse the messages built for the previous call when its turns are an unchanged
+        # prefix of this one, so only the new turns are converted
+        cached_turns, cached_history = self._history_cache
+        if turns[:len(cached_turns)] == cached_turns:
+            history = list(cached_history)
+            new_turns = turns[len(cached_turns):]
+        else:
+            history = []
+            new_turns = turns
+        for user_message, assistant_message in new_turns:
+            history.append(ChatMessage(role=MessageRole.USER, content=user_message))
+            history.append(ChatMessage(role=MessageRole.ASSISTANT, content=assistant_message))
+        self._history_cache = (turns, history)
+        # Hand out a copy: chat memory may append to the list it is given
+        return list(history)
 
     def _load_missing_files(self, missing_files: list[str]) -> list[str]:
         if not missing_files:
@@ -1,10 +1,45 @@
 """
 Smart document query detection and optimization
 """
+import functools
 import re
 from typing import Optional, Tuple
 
 
+# Common patterns for document queries
+_EXTRACT_PATTERNS = [
+    re.compile(pattern, re.IGNORECASE)
+    for pattern in (
+        r'what\s+is\s+([^\s?]+?\.\w+)\s+about',
+        r'summarize\s+([^\s?]+?\.\w+)',
+        r'tell\s+me\s+about\s+([^\s?]+?\.\w+)',
+        r'tóm\s+tắt\s+([^\s?]+?\.\w+)',
+        r'([^\s?]+?\.\w+)\s+về\s+cái\s+gì',
+        r'([^\s?]+?\.\w+)\s+nói\s+về\s+gì',
+        r'file\s+([^\s?]+?\.\w+)',
+        r'document\s+([^\s?]+?\.\w+)',
+    )
+]
+
+# Patterns that should be translated to Vietnamese
+# Order matters - more specific patterns first
+_TRANSLATE_PATTERNS = [
+    (re.compile(pattern, re.IGNORECASE), replacement)
+    for pattern, replacement in (
+        # Static patterns (no capture groups) - must come before generic patterns
+        (r'^what\s+about\s+(?:this|that)\s+(?:document|doc|file).*$', 'Cho tôi biết tài liệu này nói về điều gì'),
+        (r'^summarize\s+(?:this|that|the)\s+(?:document|doc|file).*$', 'Hãy tóm tắt tài liệu này'),
+        # Patterns with capture groups
+        (r'^what\s+is\s+(.+?)\s+about\??$', r'Tóm tắt nội dung chính của \1'),
+        (r'^summarize\s+(.+?)$', r'Tóm tắt \1'),
+        (r'^tell\s+me\s+about\s+(.+?)$', r'Cho tôi biết thông tin về \1'),
+        (r'^describe\s+(.+?)$', r'Mô tả \1'),
+        (r'^what\s+about\s+(.+?\.[^\s?]+)\??$', r'Cho tôi biết thông tin về \1'),
+        (r'^what\s+about\s+document\s+(.+?)\??$', r'Cho tôi biết thông tin về \1'),
+    )
+]
+
+
 def extract_document_from_query(query: str, available_docs: list[str]) -> Optional[str]:
     """
     Extract specific document mentioned in query for smart filtering.
@@ -20,32 +55,37 @@ def extract_document_from_query(query: str, available_docs: list[str]) -> Option
     if not query or not available_docs:
         return None
     
+    # Tuple keeps the list order (first match wins) while being hashable for the cache
+    return _extract_document(query, tuple(available_docs))
+
+
+@functools.lru_cache(maxsize=2048)
+def _extract_document(query: str, available_docs: Tuple[str, ...]) -> Optional[str]:
+    """Cached body of extract_document_from_query"""
     query_lower = query.lower()
     
-    # Common patterns for document queries
-    patterns = [
-        r'what\s+is\s+([^\s?]+?\.\w+)\s+about',
-        r'summarize\s+([^\s?]+?\.\w+)',
-        r'tell\s+me\s+about\s+([^\s?]+?\.\w+)',
-        r'tóm\s+tắt\s+([^\s?]+?\.\w+)',
-        r'([^\s?]+?\.\w+)\s+về\s+cái\s+gì',
-        r'([^\s?]+?\.\w+)\s+nói\s+về\s+gì',
-        r'file\s+([^\s?]+?\.\w+)',
-        r'document\s+([^\s?]+?\.\w+)',
-    ]
+    # Lowercased name -> original name; the first listed document wins on case-only duplicates
+    docs_by_name = {}
+    for doc in available_docs:
+        docs_by_name.setdefault(doc.lower(), doc)
     
-    for pattern in patterns:
-        match = re.search(pattern, query_lower, re.IGNORECASE)
+    # A pattern can only succeed if some document name appears verbatim, so most
+    # queries (which name no file) skip the pattern sweep entirely
+    if not any(name in query_lower for name in docs_by_name):
+        return None
+    
+    for pattern in _EXTRACT_PATTERNS:
+        match = pattern.search(query_lower)
         if match:
-            potential_doc = match.group(1)
             # Check if this document exists in available docs (case-insensitive)
-            for doc in available_docs:
-                if doc.lower() == potential_doc.lower():
-                    return doc
+            doc = docs_by_name.get(match.group(1).lower())
+            if doc is not None:
+                return doc
     
     return None
 
 
+@functools.lru_cache(maxsize=2048)
 def translate_query_to_vietnamese(query: str) -> Tuple[str, bool]:
     """
     Translate document summary queries to Vietnamese for Vietnamese responses.
@@ -53,31 +93,13 @@ def translate_query_to_vietnamese(query: str) -> Tuple[str, bool]:
     Returns:
         (translated_query, was_translated)
     """
-    query_lower = query.lower().strip()
-    
-    # Patterns that should be translated to Vietnamese
-    # Order matters - more specific patterns first
-    patterns = [
-        # Static patterns (no capture groups) - must come before generic patterns
-        (r'^what\s+about\s+(?:this|that)\s+(?:document|doc|file).*$', 'Cho tôi biết tài liệu này nói về điều gì'),
-        (r'^summarize\s+(?:this|that|the)\s+(?:document|doc|file).*$', 'Hãy tóm tắt tài liệu này'),
-        # Patterns with capture groups
-        (r'^what\s+is\s+(.+?)\s+about\??$', r'Tóm tắt nội dung chính của \1'),
-        (r'^summarize\s+(.+?)$', r'Tóm tắt \1'),
-        (r'^tell\s+me\s+about\s+(.+?)$', r'Cho tôi biết thông tin về \1'),
-        (r'^describe\s+(.+?)$', r'Mô tả \1'),
-        (r'^what\s+about\s+(.+?\.[^\s?]+)\??$', r'Cho tôi biết thông tin về \1'),
-        (r'^what\s+about\s+document\s+(.+?)\??$', r'Cho tôi biết thông tin về \1'),
-    ]
+    # Match case-insensitively on the original text so the captured document name keeps its case
+    query_stripped = query.strip()
     
-    for pattern, replacement in patterns:
-        match = re.search(pattern, query_lower, re.IGNORECASE)
+    for pattern, replacement in _TRANSLATE_PATTERNS:
+        match = pattern.search(query_stripped)
         if match:
-            # Get the original case for document name
-            original_match = re.search(pattern, query, re.IGNORECASE)
-            doc_name = ''
-            if original_match and original_match.lastindex:
-                doc_name = original_match.group(1)
+            doc_name = match.group(1) if match.lastindex else ''
 
             if r'\1' in replacement:
                 if not doc_name:
@@ -90,6 +112,7 @@ def translate_query_to_vietnamese(query: str) -> Tuple[str, bool]:
     return query, False
 
 
+@functools.lru_cache(maxsize=2048)
 def should_use_vietnamese_response(query: str) -> bool:
     """
     Determine if response should be in Vietnamese based on query language.
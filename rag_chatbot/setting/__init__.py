@@ -1,5 +1,6 @@
-from .setting import RAGSettings
+from .setting import RAGSettings, get_settings
 
 __all__ = [
     "RAGSettings",
+    "get_settings",
 ]
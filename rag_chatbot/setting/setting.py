@@ -1,3 +1,5 @@
+import functools
+
 from pydantic import BaseModel, Field
 from typing import List
 
@@ -63,6 +65,11 @@ class IngestionSettings(BaseModel):
     )
     paragraph_sep: str = Field(default="\n \n", description="Paragraph separator")
     num_workers: int = Field(default=4, description="Number of workers")
+    # Off by default: a quantized cache is lossy, so restarts would retrieve with slightly
+    # different vectors than the run that embedded the files
+    quantize_cached_embeddings: bool = Field(
+        default=False, description="Store cached embeddings as int8 with a per-row scale (lossy)"
+    )
 
 
 class StorageSettings(BaseModel):
@@ -83,3 +90,9 @@ class RAGSettings(BaseModel):
     retriever: RetrieverSettings = RetrieverSettings()
     ingestion: IngestionSettings = IngestionSettings()
     storage: StorageSettings = StorageSettings()
+
+
+@functools.cache
+def get_settings() -> RAGSettings:
+    """Shared settings instance for components that only read it; build a fresh RAGSettings() to modify one"""
+    return RAGSettings()
@@ -28,6 +28,7 @@ class AdminUI:
         
         uploaded_count = 0
         uploaded_files = []
+        new_documents = []
         
         for file in files:
             try:
@@ -47,14 +48,14 @@ class AdminUI:
                 # Get file size
                 file_size = os.path.getsize(dest_path)
                 
-                # Add to database
-                doc_id = document_manager.add_document(
-                    filename=filename,
-                    original_filename=filename,
-                    file_type=file_type,
-                    file_size=file_size,
-                    uploaded_by="admin"
-                )
+                # Queue the database record; all uploads are recorded in one transaction
+                new_documents.append({
+                    "filename": filename,
+                    "original_filename": filename,
+                    "file_type": file_type,
+                    "file_size": file_size,
+                    "uploaded_by": "admin"
+                })
                 
                 uploaded_files.append(dest_path)
                 uploaded_count += 1
@@ -63,6 +64,24 @@ class AdminUI:
                 print(f"Error uploading {filename}: {e}")
                 continue
         
+        # Add to database; if the batch fails (e.g. database is locked), record the files one
+        # at a time and remove the copies whose row still cannot be written
+        failed_files = []
+        try:
+            document_manager.add_documents(new_documents)
+        except Exception as e:
+            print(f"Error recording uploads in one transaction, retrying per file: {e}")
+            for doc, dest_path in zip(new_documents, list(uploaded_files)):
+                try:
+                    document_manager.add_document(**doc)
+                except Exception as row_error:
+                    print(f"Error recording {doc['filename']}: {row_error}")
+                    if os.path.exists(dest_path):
+                        os.remove(dest_path)
+                    uploaded_files.remove(dest_path)
+                    uploaded_count -= 1
+                    failed_files.append(doc["filename"])
+        
         if uploaded_count > 0:
             # Process documents with RAG pipeline
             try:
@@ -73,6 +92,8 @@ class AdminUI:
                 message = f"⚠️ Uploaded {uploaded_count} document(s) but processing failed: {e}"
         else:
             message = "❌ No valid documents uploaded"
+        if failed_files:
+            message += f". Could not record {len(failed_files)} file(s): {', '.join(failed_files)}"
         
         return message, self._format_documents_list()
     
@@ -172,7 +172,7 @@ class UserUI:
             }
             
             # Save to chat history
-            chat_history_manager.add_chat(
+            chat_history_manager.add_chat_async(
                 session_id=self.session_id,
                 question=message,
                 answer=final_answer,
@@ -6,10 +6,13 @@ import feedparser
 import requests
 from bs4 import BeautifulSoup
 from datetime import datetime, timedelta
-from typing import List, Dict, Optional
+from typing import TYPE_CHECKING, List, Dict, Optional
 import time
 from ..database import news_manager, db
-from ..pipeline import LocalRAGPipeline
+
+# Only needed for annotations; the caller hands in an already-built pipeline
+if TYPE_CHECKING:
+    from ..pipeline import LocalRAGPipeline
 
 
 # Role-specific news sources configuration
@@ -152,7 +155,7 @@ ROLE_NEWS_SOURCES = {
 class NewsFetcher:
     """Fetches and processes technical news articles"""
     
-    def __init__(self, pipeline: Optional[LocalRAGPipeline] = None):
+    def __init__(self, pipeline: Optional["LocalRAGPipeline"] = None):
         self.pipeline = pipeline
         self.session = requests.Session()
         self.session.headers.update({
@@ -318,24 +321,26 @@ class NewsFetcher:
             # Fetch articles
             if source_config['type'] == 'rss':
                 articles = self.fetch_rss_feed(source_config['url'])
+                rows = []
                 
                 for article in articles:
                     # Optionally fetch full content
                     if fetch_content and article['url']:
                         article['content'] = self.fetch_article_content(article['url'])
                     
-                    # Add to database
-                    news_manager.add_article(
-                        source_id=source_id,
-                        title=article['title'],
-                        summary=article['summary'],
-                        content=article['content'],
-                        url=article['url'],
-                        published_date=article['published_date'],
-                        role_type=role_type
-                    )
-                    
-                    total_articles += 1
+                    rows.append((
+                        source_id,
+                        article['title'],
+                        article['summary'],
+                        article['content'],
+                        article['url'],
+                        article['published_date'],
+                        role_type
+                    ))
+                
+                # Add to database in one transaction
+                news_manager.add_articles(rows)
+                total_articles += len(rows)
                 
                 # Small delay to be polite
                 time.sleep(1)
@@ -360,7 +365,7 @@ class NewsFetcher:
             return
         
         # Get unem bedded articles
-        conn = db.get_connection()
+        conn = db.get_read_connection()
         cursor = conn.cursor()
         
         if role_type:
@@ -451,7 +456,7 @@ def init_default_sources():
 
 
 # Scheduled fetch function
-def scheduled_news_fetch(pipeline: LocalRAGPipeline = None, fetch_content: bool = True):
+def scheduled_news_fetch(pipeline: "LocalRAGPipeline" = None, fetch_content: bool = True):
     """Run periodic news fetch (can be scheduled with cron or APScheduler)"""
     print(f"[{datetime.now()}] Starting scheduled news fetch...")
     
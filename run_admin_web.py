@@ -414,6 +414,7 @@ def upload_documents():
                     print(f"Found orphaned file: {filename} - will overwrite")
         
         # Second pass: actually upload the files
+        new_documents = []
         for file in files_to_upload:
             filename = secure_filename(file.filename)
             file_path = os.path.join(DATA_DIR, filename)
@@ -452,14 +453,14 @@ def upload_documents():
                 file_size = os.path.getsize(file_path)
                 file_type = Path(filename).suffix.lower()
                 
-                # Add to database
-                document_manager.add_document(
-                    filename=filename,
-                    original_filename=filename,
-                    file_type=file_type,
-                    file_size=file_size,
-                    uploaded_by='admin'
-                )
+                # Queue the database record; all uploads are recorded in one transaction
+                new_documents.append({
+                    'filename': filename,
+                    'original_filename': filename,
+                    'file_type': file_type,
+                    'file_size': file_size,
+                    'uploaded_by': 'admin'
+                })
                 
                 uploaded_files.append(file_path)
                 uploaded_count += 1
@@ -470,6 +471,26 @@ def upload_documents():
                 skipped_files.append(filename)
                 continue
         
+        # Add to database; if the batch fails (e.g. database is locked), record the files one
+        # at a time and remove the saved files whose row still cannot be written
+        failed_files = []
+        try:
+            document_manager.add_documents(new_documents)
+        except Exception as e:
+            print(f"Error recording uploads in one transaction, retrying per file: {e}")
+            for doc, file_path in zip(new_documents, list(uploaded_files)):
+                try:
+                    document_manager.add_document(**doc)
+                except Exception as row_error:
+                    print(f"Error recording {doc['filename']}: {row_error}")
+                    if os.path.exists(file_path):
+                        os.remove(file_path)
+                    uploaded_files.remove(file_path)
+                    uploaded_count -= 1
+                    failed_files.append(doc['filename'])
+                    skipped_files.append(doc['filename'])
+        duplicate_files = [f for f in skipped_files if f not in failed_files]
+        
         if uploaded_count > 0:
             # Process documents with RAG pipeline
             try:
@@ -477,8 +498,10 @@ def upload_documents():
                 pipeline.set_chat_mode()
                 
                 message = f'Successfully uploaded and processed {uploaded_count} document(s)'
-                if skipped_files:
-                    message += f'. Skipped {len(skipped_files)} duplicate(s): {", ".join(skipped_files)}'
+                if duplicate_files:
+                    message += f'. Skipped {len(duplicate_files)} duplicate(s): {", ".join(duplicate_files)}'
+                if failed_files:
+                    message += f'. Could not record {len(failed_files)} file(s): {", ".join(failed_files)}'
                 
                 return jsonify({
                     'success': True,
@@ -494,8 +517,10 @@ def upload_documents():
                 })
         else:
             message = 'No new files uploaded'
-            if skipped_files:
-                message += f'. All {len(skipped_files)} file(s) already exist: {", ".join(skipped_files)}'
+            if duplicate_files:
+                message += f'. {len(duplicate_files)} file(s) already exist: {", ".join(duplicate_files)}'
+            if failed_files:
+                message += f'. Could not record {len(failed_files)} file(s): {", ".join(failed_files)}'
             
             return jsonify({
                 'success': False,
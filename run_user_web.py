@@ -119,7 +119,7 @@ def record_chat_interaction(session_id: str, question: str, answer: str, sources
         'sources': sources
     }
 
-    chat_history_manager.add_chat(
+    chat_history_manager.add_chat_async(
         session_id=session_id,
         question=question,
         answer=answer,
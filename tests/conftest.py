@@ -0,0 +1,10 @@
+import pytest
+
+from rag_chatbot.database import Database
+
+
+@pytest.fixture
+def db(tmp_path):
+    database = Database(str(tmp_path / "knowledge_system.db"))
+    yield database
+    database.write_buffer.flush()
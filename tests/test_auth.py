@@ -0,0 +1,116 @@
+import hashlib
+import sqlite3
+
+import pytest
+
+from rag_chatbot.auth import AUTH_SCHEMA_VERSION, AuthManager
+
+
+@pytest.fixture
+def auth(tmp_path):
+    return AuthManager(str(tmp_path / "knowledge_base.db"))
+
+
+def _register(auth, username, password="secret123"):
+    success, message, user_id = auth.register_user(username, f"{username}@example.com", password)
+    assert success, message
+    return user_id
+
+
+def test_login_upgrades_legacy_sha256_hash(auth):
+    user_id = _register(auth, "alice")
+    legacy_hash = hashlib.sha256(b"secret123").hexdigest()
+    with auth._conn() as conn:
+        conn.execute("UPDATE users SET password_hash = ? WHERE id = ?", (legacy_hash, user_id))
+
+    success, _, token, user_info = auth.login("alice", "secret123")
+
+    assert success and token
+    assert user_info["id"] == user_id
+    stored = auth._conn().execute("SELECT password_hash FROM users WHERE id = ?", (user_id,)).fetchone()[0]
+    assert stored != legacy_hash
+    assert "$" in stored
+    # The upgraded scrypt hash keeps working, and still rejects wrong passwords
+    assert auth.login("alice", "secret123")[0]
+    assert not auth.login("alice", "wrong-password")[0]
+
+
+def test_login_rejects_wrong_password_for_legacy_hash(auth):
+    user_id = _register(auth, "bob")
+    legacy_hash = hashlib.sha256(b"secret123").hexdigest()
+    with auth._conn() as conn:
+        conn.execute("UPDATE users SET password_hash = ? WHERE id = ?", (legacy_hash, user_id))
+
+    assert not auth.login("bob", "wrong-password")[0]
+    stored = auth._conn().execute("SELECT password_hash FROM users WHERE id = ?", (user_id,)).fetchone()[0]
+    assert stored == legacy_hash
+
+
+def test_session_expiry_migration_runs_once(tmp_path):
+    db_path = str(tmp_path / "knowledge_base.db")
+    AuthManager(db_path)
+
+    # Simulate a database from before the migration: text expiry, no user_version
+    conn = sqlite3.connect(db_path)
+    conn.execute(
+        "INSERT INTO sessions (user_id, session_token, expires_at) VALUES (1, 'old', '2030-01-01 00:00:00')"
+    )
+    conn.execute("PRAGMA user_version = 0")
+    conn.commit()
+
+    AuthManager(db_path)
+    assert conn.execute("SELECT typeof(expires_at) FROM sessions").fetchone()[0] == "integer"
+    assert conn.execute("PRAGMA user_version").fetchone()[0] == AUTH_SCHEMA_VERSION
+
+    # Once at the current version, startup no longer rewrites the sessions table
+    conn.execute("UPDATE sessions SET expires_at = '2030-01-01 00:00:00'")
+    conn.commit()
+    AuthManager(db_path)
+    assert conn.execute("SELECT typeof(expires_at) FROM sessions").fetchone()[0] == "text"
+    conn.close()
+
+
+def test_validate_sessions_maps_each_token(auth):
+    alice_id = _register(auth, "alice")
+    _register(auth, "bob")
+    _, _, alice_token, _ = auth.login("alice", "secret123")
+    _, _, bob_token, _ = auth.login("bob", "secret123")
+    _, _, expired_token, _ = auth.login("bob", "secret123")
+    with auth._conn() as conn:
+        conn.execute("UPDATE sessions SET expires_at = 0 WHERE session_token = ?", (expired_token,))
+    # Deactivating a user also ends their sessions; re-add one to check the is_active filter
+    auth.set_users_active([alice_id], False)
+    with auth._conn() as conn:
+        conn.execute(
+            "INSERT INTO sessions (user_id, session_token, expires_at) VALUES (?, ?, ?)",
+            (alice_id, alice_token, 2**31),
+        )
+
+    results = auth.validate_sessions([bob_token, "unknown", expired_token, alice_token])
+
+    assert list(results) == [bob_token, "unknown", expired_token, alice_token]
+    assert results[bob_token]["username"] == "bob"
+    assert "password_hash" not in results[bob_token]
+    assert results["unknown"] is None
+    assert results[expired_token] is None
+    assert results[alice_token] is None
+    # Expired sessions are removed as a side effect
+    remaining = auth._conn().execute(
+        "SELECT 1 FROM sessions WHERE session_token = ?", (expired_token,)
+    ).fetchone()
+    assert remaining is None
+    assert auth.validate_sessions([]) == {}
+
+
+def test_get_users_by_ids(auth):
+    alice_id = _register(auth, "alice")
+    bob_id = _register(auth, "bob")
+
+    users = auth.get_users_by_ids([bob_id, alice_id, bob_id, None, 9999])
+
+    assert set(users) == {alice_id, bob_id}
+    assert users[alice_id]["username"] == "alice"
+    assert users[bob_id]["email"] == "bob@example.com"
+    assert users[bob_id] == auth.get_user_info(bob_id)
+    assert "password_hash" not in users[alice_id]
+    assert auth.get_users_by_ids([]) == {}
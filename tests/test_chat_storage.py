@@ -0,0 +1,66 @@
+from datetime import datetime
+
+import orjson
+import pytest
+
+from rag_chatbot.chat_storage import ChatStorage, SQLiteChatStorage, _tail_lines
+
+
+@pytest.fixture
+def history_file(tmp_path):
+    path = tmp_path / "user_1_history.jsonl"
+    path.write_bytes(b"".join(b'{"id": %d}\n' % i for i in range(1, 101)))
+    return path
+
+
+@pytest.mark.parametrize("chunk_size", [1, 7, 64, 8192])
+def test_tail_lines_returns_last_n_complete_lines(history_file, chunk_size):
+    lines = _tail_lines(history_file, 5, chunk_size=chunk_size)
+
+    assert lines == [b'{"id": %d}' % i for i in range(96, 101)]
+
+
+def test_tail_lines_returns_whole_file_when_shorter_than_n(history_file):
+    lines = _tail_lines(history_file, 500, chunk_size=16)
+
+    assert len(lines) == 100
+    assert lines[0] == b'{"id": 1}'
+
+
+def test_tail_lines_skips_blank_lines_and_missing_final_newline(tmp_path):
+    path = tmp_path / "history.jsonl"
+    path.write_bytes(b"one\n\ntwo\n\n\nthree")
+
+    assert _tail_lines(path, 2, chunk_size=3) == [b"two", b"three"]
+    assert _tail_lines(path, 1) == [b"three"]
+
+
+def test_tail_lines_empty_file(tmp_path):
+    path = tmp_path / "history.jsonl"
+    path.write_bytes(b"")
+
+    assert _tail_lines(path, 10) == []
+
+
+def test_history_timestamps_are_iso_for_old_and_new_entries(tmp_path):
+    storage = ChatStorage(str(tmp_path))
+    legacy = {"id": 1, "session_id": "s1", "question": "q1", "answer": "a1", "sources": [],
+              "timestamp": "2024-05-01T10:00:00.123456"}
+    (tmp_path / "user_1_history.jsonl").write_bytes(orjson.dumps(legacy) + b"\n")
+    storage.save_chat(1, "q2", "a2", session_id="s1")
+
+    timestamps = [entry["timestamp"] for entry in storage.get_user_history(1)]
+
+    assert timestamps[1] == "2024-05-01T10:00:00.123456"
+    assert isinstance(timestamps[0], str)
+    datetime.fromisoformat(timestamps[0])
+
+
+def test_sqlite_history_timestamps_are_iso(tmp_path):
+    storage = SQLiteChatStorage(str(tmp_path))
+    storage.save_chat(1, "q1", "a1", session_id="s1")
+
+    (entry,) = storage.get_user_history(1)
+
+    assert isinstance(entry["timestamp"], str)
+    datetime.fromisoformat(entry["timestamp"])
@@ -0,0 +1,204 @@
+import orjson
+import pytest
+
+from rag_chatbot.database import ChatHistoryManager, Database, NewsManager
+
+
+def test_write_buffer_keeps_good_statements_when_batch_fails(db):
+    chats = ChatHistoryManager(db)
+    chats.add_chat_async("s1", "first", "ok")
+    # Fails inside the batch transaction, rolling back the statements around it
+    db.write_buffer.put("INSERT INTO missing_table VALUES (?)", (1,))
+    chats.add_chat_async("s1", "second", "ok")
+    db.write_buffer.flush()
+
+    assert [row["question"] for row in chats.get_session_history("s1")] == ["first", "second"]
+
+
+def test_write_buffer_survives_unexpected_errors(db, monkeypatch):
+    chats = ChatHistoryManager(db)
+
+    def broken(batch):
+        raise RuntimeError("disk gone")
+
+    monkeypatch.setattr(db.write_buffer, "_write_batch", broken)
+    chats.add_chat_async("s1", "lost", "ok")
+    db.write_buffer.flush()
+    monkeypatch.undo()
+
+    chats.add_chat_async("s1", "kept", "ok")
+    db.write_buffer.flush()
+
+    assert db.write_buffer._thread.is_alive()
+    assert [row["question"] for row in chats.get_session_history("s1")] == ["kept"]
+
+
+def _article(url, title="Title", source_id=None, published_date="2024-01-01"):
+    return (source_id, title, "summary", "content", url, published_date, "developer")
+
+
+@pytest.mark.parametrize("upsert", [True, False])
+def test_add_articles_skips_known_urls(db, upsert):
+    news = NewsManager(db)
+    db.article_upsert = db.article_upsert and upsert
+    existing_id = news.add_article(*_article("https://example.com/a"))
+
+    ids = news.add_articles([
+        _article("https://example.com/b"),
+        _article("https://example.com/a", title="Duplicate"),
+        _article("https://example.com/c"),
+        _article("https://example.com/b", title="Duplicate in batch"),
+    ])
+
+    assert ids[1] == existing_id
+    assert ids[3] == ids[0]
+    assert len({ids[0], ids[2], existing_id}) == 3
+    conn = db.get_read_connection()
+    titles = [row[0] for row in conn.execute("SELECT title FROM technical_articles ORDER BY id")]
+    conn.close()
+    assert titles == ["Title", "Title", "Title"]
+    assert news.add_articles([]) == []
+
+
+def test_add_chats_inserts_in_one_call(db):
+    chats = ChatHistoryManager(db)
+
+    count = chats.add_chats([
+        {"session_id": "s1", "question": "q1", "answer": "a1", "user_id": 7},
+        {"session_id": "s1", "question": "q2", "answer": "a2", "sources": [{"file": "doc.pdf"}]},
+        {"session_id": "s2", "question": "q3", "answer": "a3", "user_type": "admin"},
+    ])
+
+    assert count == 3
+    history = chats.get_session_history("s1")
+    assert [row["question"] for row in history] == ["q1", "q2"]
+    assert history[0]["user_id"] == 7
+    assert history[0]["sources"] is None
+    assert orjson.loads(history[1]["sources"]) == [{"file": "doc.pdf"}]
+    assert chats.get_session_history("s2")[0]["user_type"] == "admin"
+
+
+def test_chat_counters_follow_inserts_and_deletes(db):
+    chats = ChatHistoryManager(db)
+    chats.add_chat("s1", "q1", "a1", user_id=1)
+    chats.add_chat("s1", "q2", "a2", user_id=1)
+    chats.add_chats([
+        {"session_id": "s2", "question": "q3", "answer": "a3", "user_id": 2},
+        {"session_id": "s3", "question": "q4", "answer": "a4"},
+    ])
+
+    assert chats.get_chat_count() == 4
+    assert chats.get_user_chat_count(1) == 2
+    assert chats.get_user_chat_count(2) == 1
+    assert chats.get_user_chat_count(3) == 0
+
+    conn = db.get_connection()
+    conn.execute("DELETE FROM chat_history WHERE user_id = 1 AND question = 'q1'")
+    conn.commit()
+    conn.close()
+
+    assert chats.get_chat_count() == 3
+    assert chats.get_user_chat_count(1) == 1
+
+
+def test_chat_counters_backfilled_on_upgrade(tmp_path):
+    db_path = str(tmp_path / "knowledge_system.db")
+    old = Database(db_path)
+    ChatHistoryManager(old).add_chats([
+        {"session_id": "s1", "question": "q1", "answer": "a1", "user_id": 1},
+        {"session_id": "s1", "question": "q2", "answer": "a2", "user_id": 1},
+        {"session_id": "s2", "question": "q3", "answer": "a3"},
+    ])
+    # Roll the file back to a schema from before the counter tables
+    conn = old.get_connection()
+    conn.executescript("""
+        DROP TRIGGER chat_count_ins;
+        DROP TRIGGER chat_count_del;
+        DROP TABLE stats;
+        DROP TABLE stats_user;
+        PRAGMA user_version = 1;
+    """)
+    conn.close()
+
+    chats = ChatHistoryManager(Database(db_path))
+
+    assert chats.get_chat_count() == 3
+    assert chats.get_user_chat_count(1) == 2
+    chats.add_chat("s3", "q4", "a4", user_id=1)
+    assert chats.get_chat_count() == 4
+    assert chats.get_user_chat_count(1) == 3
+
+
+@pytest.fixture
+def news(db):
+    news = NewsManager(db)
+    news.add_articles([
+        _article("https://example.com/1", title="Kubernetes networking deep dive", published_date="2024-01-01"),
+        _article("https://example.com/2", title="Kubernetes networking basics", published_date="2024-03-01"),
+        _article("https://example.com/3", title="Tối ưu hóa PostgreSQL", published_date="2024-02-01"),
+    ])
+    return news
+
+
+@pytest.mark.parametrize("fts", [True, False])
+def test_find_article_by_title(db, news, fts):
+    db.article_fts = db.article_fts and fts
+
+    assert news.find_article_by_title("deep dive")["url"] == "https://example.com/1"
+    assert news.find_article_by_title("PostgreSQL")["url"] == "https://example.com/3"
+    assert news.find_article_by_title("kubernetes networking")["url"] in {
+        "https://example.com/1", "https://example.com/2"
+    }
+    assert news.find_article_by_title("GraphQL") is None
+    assert news.find_article_by_title("") is None
+
+
+def test_find_article_by_title_fts_prefix_and_diacritics(db, news):
+    if not db.article_fts:
+        pytest.skip("SQLite built without FTS5")
+
+    # Words match by prefix, in any order, ignoring Vietnamese diacritics
+    assert news.find_article_by_title("netw kube dee")["url"] == "https://example.com/1"
+    assert news.find_article_by_title("toi uu")["url"] == "https://example.com/3"
+    # Punctuation only: nothing to match, and no FTS syntax error
+    assert news.find_article_by_title('"*()') is None
+
+
+def test_find_article_by_title_fts_follows_title_updates(db, news):
+    if not db.article_fts:
+        pytest.skip("SQLite built without FTS5")
+
+    conn = db.get_connection()
+    conn.execute("UPDATE technical_articles SET title = 'Service mesh overview' WHERE url = 'https://example.com/1'")
+    conn.commit()
+    conn.close()
+
+    assert news.find_article_by_title("service mesh")["url"] == "https://example.com/1"
+    assert news.find_article_by_title("deep dive") is None
+
+
+def test_article_fts_repaired_after_interrupted_migration(tmp_path):
+    db_path = str(tmp_path / "knowledge_system.db")
+    old = Database(db_path)
+    if not old.article_fts:
+        pytest.skip("SQLite built without FTS5")
+    NewsManager(old).add_articles([_article("https://example.com/1", title="Kubernetes networking deep dive")])
+    # An earlier start stopped after creating the FTS table, before its triggers and rebuild
+    conn = old.get_connection()
+    conn.executescript("""
+        DROP TABLE technical_articles_fts;
+        CREATE VIRTUAL TABLE technical_articles_fts USING fts5(
+            title, summary, content='technical_articles', content_rowid='id'
+        );
+        DROP TRIGGER technical_articles_fts_ai;
+        PRAGMA user_version = 3;
+    """)
+    conn.close()
+
+    db = Database(db_path)
+    news = NewsManager(db)
+
+    assert db.article_fts
+    assert news.find_article_by_title("deep dive")["url"] == "https://example.com/1"
+    news.add_articles([_article("https://example.com/2", title="Service mesh overview")])
+    assert news.find_article_by_title("service mesh")["url"] == "https://example.com/2"
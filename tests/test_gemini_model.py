@@ -0,0 +1,57 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+import requests
+
+from rag_chatbot.core.model.gemini_model import GeminiLLM
+
+
+def _llm_with(models, **kwargs):
+    llm = GeminiLLM(api_key="test", retry_backoff=0, **kwargs)
+    object.__setattr__(llm, "_client", SimpleNamespace(models=models, aio=SimpleNamespace(models=models)))
+    return llm
+
+
+def test_complete_retries_transient_errors():
+    calls = []
+
+    def generate_content(model, contents):
+        calls.append(contents)
+        if len(calls) == 1:
+            raise requests.ConnectionError("connection reset")
+        return SimpleNamespace(text="ok")
+
+    llm = _llm_with(SimpleNamespace(generate_content=generate_content))
+
+    assert llm.complete("question").text == "ok"
+    assert calls == ["question", "question"]
+
+
+def test_complete_does_not_retry_other_errors():
+    calls = []
+
+    def generate_content(model, contents):
+        calls.append(contents)
+        raise ValueError("bad request")
+
+    llm = _llm_with(SimpleNamespace(generate_content=generate_content))
+
+    assert llm.complete("question").text == "Error: bad request"
+    assert len(calls) == 1
+
+
+@pytest.mark.asyncio
+async def test_acomplete_times_out_and_gives_up_after_max_retries():
+    calls = []
+
+    async def generate_content(model, contents):
+        calls.append(contents)
+        await asyncio.sleep(1)
+
+    llm = _llm_with(SimpleNamespace(generate_content=generate_content), timeout=0.01, max_retries=1)
+
+    response = await llm.acomplete("question")
+
+    assert response.text.startswith("Error")
+    assert len(calls) == 2
@@ -0,0 +1,32 @@
+from types import SimpleNamespace
+
+from llama_index.core.schema import TextNode
+
+from rag_chatbot.core.ingestion import ingestion
+from rag_chatbot.core.ingestion.ingestion import LocalDataIngestion
+
+
+def test_embed_files_falls_back_per_file_when_the_batch_fails(monkeypatch):
+    calls = []
+
+    def embed_model(nodes, show_progress=False):
+        calls.append(len(nodes))
+        if len(nodes) > 2 or any(node.text == "bad" for node in nodes):
+            raise RuntimeError("CUDA out of memory")
+        for node in nodes:
+            node.embedding = [1.0]
+        return nodes
+
+    monkeypatch.setattr(ingestion, "Settings", SimpleNamespace(embed_model=embed_model))
+    split_files = [
+        ("a.txt", "a.txt", [TextNode(text="one"), TextNode(text="two")]),
+        ("b.txt", "b.txt", [TextNode(text="bad")]),
+        ("c.txt", "c.txt", [TextNode(text="three")]),
+    ]
+
+    # The ingestion cache is not needed to embed, so skip __init__ and its cache directory
+    embedded = LocalDataIngestion.__new__(LocalDataIngestion)._embed_files(split_files)
+
+    assert calls == [4, 2, 1, 1]
+    assert [file_name for _, file_name, _ in embedded] == ["a.txt", "c.txt"]
+    assert all(node.embedding == [1.0] for _, _, nodes in embedded for node in nodes)
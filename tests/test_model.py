@@ -0,0 +1,64 @@
+import asyncio
+
+import orjson
+import pytest
+from llama_index.core.llms import CompletionResponse
+
+from rag_chatbot.core.model.model import OpenRouterLLM
+
+
+@pytest.mark.asyncio
+async def test_complete_batch_checkpoints_other_results_when_one_prompt_fails(tmp_path, monkeypatch):
+    checkpoint = tmp_path / "batch.jsonl"
+    prompts = ["first", "fails", "third", "fourth"]
+
+    async def flaky_acomplete(self, prompt, **kwargs):
+        if prompt == "fails":
+            raise RuntimeError("upstream error")
+        # Finish after the failure so the results land while the error is already in flight
+        await asyncio.sleep(0.05)
+        return CompletionResponse(text=prompt.upper())
+
+    monkeypatch.setattr(OpenRouterLLM, "acomplete", flaky_acomplete)
+    llm = OpenRouterLLM(cache_responses=False)
+
+    with pytest.raises(RuntimeError, match="upstream error"):
+        await llm.complete_batch(prompts, output_jsonl=str(checkpoint))
+
+    records = [orjson.loads(line) for line in checkpoint.read_bytes().splitlines()]
+    assert sorted(record["index"] for record in records) == [0, 2, 3]
+    assert {record["text"] for record in records} == {"FIRST", "THIRD", "FOURTH"}
+
+    # A rerun only requests the prompt that failed and reuses the checkpointed results
+    requested = []
+
+    async def acomplete(self, prompt, **kwargs):
+        requested.append(prompt)
+        return CompletionResponse(text=prompt.upper())
+
+    monkeypatch.setattr(OpenRouterLLM, "acomplete", acomplete)
+    results = await llm.complete_batch(prompts, output_jsonl=str(checkpoint))
+
+    assert requested == ["fails"]
+    assert [result.text for result in results] == ["FIRST", "FAILS", "THIRD", "FOURTH"]
+
+
+@pytest.mark.asyncio
+async def test_complete_batch_checkpoint_is_not_reused_across_models(tmp_path, monkeypatch):
+    checkpoint = tmp_path / "batch.jsonl"
+    prompts = ["first", "second"]
+    requested = []
+
+    async def acomplete(self, prompt, **kwargs):
+        requested.append((self.model, prompt))
+        return CompletionResponse(text=f"{self.model}:{prompt}")
+
+    monkeypatch.setattr(OpenRouterLLM, "acomplete", acomplete)
+    await OpenRouterLLM(model="model-a", cache_responses=False).complete_batch(prompts, output_jsonl=str(checkpoint))
+
+    results = await OpenRouterLLM(model="model-b", cache_responses=False).complete_batch(
+        prompts, output_jsonl=str(checkpoint)
+    )
+
+    assert [model for model, _ in requested] == ["model-a", "model-a", "model-b", "model-b"]
+    assert [result.text for result in results] == ["model-b:first", "model-b:second"]